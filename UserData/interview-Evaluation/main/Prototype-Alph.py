@@ -1,29 +1,18 @@
 import streamlit as st
-import json, os, random
+import random
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from datetime import datetime
-
-def user_exists(uid):
-    return os.path.exists(f"data/user_{uid}.json")
+from usrstore import user_exists, loadOpen, saveUsr, saveAns, markDone, countSess, listSess, loadSess
 
 #User id and data 
 def genId(l=6):
  chars="ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
  return "".join(random.choice(chars) for _ in range(l))
 
-def loadUsr(u):
- path=f"data/user_{u}.json"
- if os.path.exists(path):
-  with open(path) as f:
-   return json.load(f)
- return {"history":[]} 
-
-# new user no data
+# user_exists/loadOpen/saveUsr live in usrstore (SQLite, one row per answer)
 
-def saveUsr(u,d):
- if not os.path.exists("data"): os.mkdir("data")
- with open(f"data/user_{u}.json","w") as f: json.dump(d,f,indent=2)
+HIST_PAGE=10  # sessions per history page
 
 
 #Dummy score, to be replaced by groq
@@ -74,9 +63,6 @@ st.title("Interview Helper")
 if "usr" not in st.session_state:
     uid = st.text_input("User ID || leave blank for new")
     
-    def user_exists(uid):
-        return os.path.exists(f"data/user_{uid}.json")
-    
     if st.button("Login"):
         if not uid:  # create new User id
             uid = genId()
@@ -87,7 +73,10 @@ if "usr" not in st.session_state:
         else:
             if user_exists(uid):  # Existing User id
                 st.success("Welcome back " + uid)
-                st.session_state.data = loadUsr(uid)
+                # Only an unfinished session is needed up front; the History
+                # tab pages through the rest on demand
+                open_sess = loadOpen(uid)
+                st.session_state.data = {"history": [open_sess] if open_sess else []}
                 st.session_state.usr = uid
             else:  # user ID does not exist
                 st.error("User ID does not exist. Please leave blank for new user or enter a valid ID.")
@@ -155,10 +144,12 @@ else:
                 "date": datetime.now().strftime("%Y-%m-%d %H:%M")
             }
             if data["history"] and not data["history"][-1].get("done", True):
+                snap["id"] = data["history"][-1].get("id")
                 data["history"][-1] = snap
             else:
                 data["history"].append(snap)
-            saveUsr(usr, data)
+            # Appends just this answer; the rest of the history is untouched
+            snap["id"] = saveAns(usr, snap, st.session_state.idx - 1, a, (s, f, t))
             st.session_state.data = data
             st.rerun()
 
@@ -167,9 +158,9 @@ else:
   #-----------------#
   else:
          st.success("done with interview yay! 🎉")
-         if data["history"]:
+         if data["history"] and not data["history"][-1].get("done", True):
             data["history"][-1]["done"] = True
-            saveUsr(usr, data)
+            markDone(usr, data["history"][-1])
          st.subheader("Feedback and Scores Summary")
 
          #Feedback and Scores
@@ -205,15 +196,25 @@ else:
  # history
  with tab2:
   st.subheader("Old sessions")
-  if data["history"]:
-   for i,sess in enumerate(data["history"]):
-    avg=0
-    try: avg=round(sum(sum(x[0].values())/len(x[0]) for x in sess["feedback"])/len(sess["feedback"]),2)
-    except: pass
-    st.write(f"Session {i+1} ({sess['date']}) avg={avg}")
-    with st.expander(f"View"):
-         for qi,(a,(s,f,t)) in enumerate(zip(sess["answers"],sess["feedback"])):
-            st.write(f"Q{qi+1}: {sess['questions'][qi]}")
+  total=countSess(usr)
+  if total:
+   pages=(total+HIST_PAGE-1)//HIST_PAGE
+   page=min(st.session_state.get("histPage",0),pages-1)
+   for i,sess in enumerate(listSess(usr,page*HIST_PAGE,HIST_PAGE)):
+    num=total-page*HIST_PAGE-i
+    if sess["done"]:
+     dims=", ".join(f"{k}={v}" for k,v in sess["avg_scores"].items())
+     st.write(f"Session {num} ({sess['date']}) avg={sess['avg']} · {sess['n_answers']} answers · {dims}")
+    else:
+     st.write(f"Session {num} ({sess['date']}) in progress · {sess['idx']} answered")
+    # Details are read from the store only once the toggle is switched on
+    if st.toggle("View", key=f"view{sess['id']}"):
+     cache=st.session_state.setdefault("sessCache",{})
+     if sess["id"] not in cache or not sess["done"]:
+      cache[sess["id"]]=loadSess(usr,sess["id"])
+     full=cache[sess["id"]]
+     for qi,(a,(s,f,t)) in enumerate(zip(full["answers"],full["feedback"])):
+            st.write(f"Q{qi+1}: {full['questions'][qi]}")
             st.write(f"Ans: {a}")
             st.write("**Scores:**")
             for k, v in s.items():
@@ -229,4 +230,13 @@ else:
                 st.write("**Suggestion:**")
                 st.write(f"- {t}")
             st.markdown("---")
+   if pages>1:
+    prev,info,nxt=st.columns([1,2,1])
+    if prev.button("Newer",disabled=page==0):
+     st.session_state.histPage=page-1
+     st.rerun()
+    info.write(f"Page {page+1} of {pages}")
+    if nxt.button("Older",disabled=page>=pages-1):
+     st.session_state.histPage=page+1
+     st.rerun()
   else: st.write("**no old sessions yet**")
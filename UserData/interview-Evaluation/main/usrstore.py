@@ -0,0 +1,225 @@
+import json, os, sqlite3, threading
+from datetime import datetime
+
+# One SQLite file for all users, in the data dir the JSON files lived in.
+# WAL lets several tabs read while one writes; every write is one transaction.
+DB_PATH = os.path.join("data", "users.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    uid TEXT PRIMARY KEY,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT NOT NULL REFERENCES users(uid),
+    date TEXT NOT NULL,
+    questions TEXT NOT NULL,
+    idx INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    n_answers INTEGER,
+    avg REAL,
+    avg_scores TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_uid ON sessions(uid, id);
+CREATE TABLE IF NOT EXISTS answers (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    pos INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    feedback TEXT NOT NULL,
+    PRIMARY KEY (session_id, pos)
+);
+"""
+
+# Columns added after the first release of users.db: name -> type
+AGGREGATE_COLUMNS = {"n_answers": "INTEGER", "avg": "REAL", "avg_scores": "TEXT"}
+
+_local = threading.local()
+
+
+def conn():
+    """Per-thread connection (Streamlit runs each script in its own thread)"""
+    c = getattr(_local, "conn", None)
+    if c is None:
+        if not os.path.exists("data"): os.mkdir("data")
+        c = sqlite3.connect(DB_PATH, timeout=10, isolation_level=None)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute("PRAGMA foreign_keys=ON")
+        c.executescript(SCHEMA)
+        _migrate(c)
+        _local.conn = c
+    return c
+
+
+class tx:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+
+    def __init__(self, c=None):
+        self.c = c
+
+    def __enter__(self):
+        self.c = self.c or conn()
+        self.c.execute("BEGIN IMMEDIATE")
+        return self.c
+
+    def __exit__(self, exc, *_):
+        self.c.execute("ROLLBACK" if exc else "COMMIT")
+
+
+def _migrate(c):
+    cols = {row[1] for row in c.execute("PRAGMA table_info(sessions)")}
+    missing = [name for name in AGGREGATE_COLUMNS if name not in cols]
+    if not missing:
+        return
+    with tx(c):
+        for name in missing:
+            c.execute(f"ALTER TABLE sessions ADD COLUMN {name} {AGGREGATE_COLUMNS[name]}")
+        for (sid,) in c.execute("SELECT id FROM sessions WHERE done=1").fetchall():
+            _aggregate(c, sid)
+
+
+def _aggregate(c, sid):
+    """Store answer count, per-dimension averages and the overall average of a session"""
+    sums, n, overall = {}, 0, 0.0
+    for (fb,) in c.execute("SELECT feedback FROM answers WHERE session_id=?", (sid,)):
+        scores = json.loads(fb)[0] or {}
+        n += 1
+        if scores:
+            overall += sum(scores.values()) / len(scores)
+        for k, v in scores.items():
+            sums[k] = sums.get(k, 0) + v
+    avg_scores = {k: round(v / n, 2) for k, v in sums.items()}
+    c.execute("UPDATE sessions SET n_answers=?, avg=?, avg_scores=? WHERE id=?",
+              (n, round(overall / n, 2) if n else 0, json.dumps(avg_scores), sid))
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M")
+
+
+def _legacy(uid):
+    # Pre-SQLite per-user JSON file, imported the first time the user is seen
+    return os.path.join("data", f"user_{uid}.json")
+
+
+def _import_legacy(uid):
+    path = _legacy(uid)
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        saveUsr(uid, json.load(f))
+    os.replace(path, path + ".imported")
+    return True
+
+
+def user_exists(uid):
+    row = conn().execute("SELECT 1 FROM users WHERE uid=?", (uid,)).fetchone()
+    return row is not None or _import_legacy(uid)
+
+
+def _session(c, row):
+    sid, date, questions, idx, done = row
+    answers, feedback = [], []
+    for a, fb in c.execute("SELECT answer, feedback FROM answers WHERE session_id=? ORDER BY pos", (sid,)):
+        answers.append(a)
+        feedback.append(json.loads(fb))
+    return {"id": sid, "questions": json.loads(questions), "answers": answers,
+            "feedback": feedback, "idx": idx, "done": bool(done), "date": date}
+
+
+def loadUsr(u):
+    c = conn()
+    if not user_exists(u):
+        return {"history": []}
+    rows = c.execute("SELECT id, date, questions, idx, done FROM sessions WHERE uid=? ORDER BY id", (u,)).fetchall()
+    return {"history": [_session(c, r) for r in rows]}
+
+
+def loadOpen(u):
+    """The user's latest session if it is still open (to resume at login), else None"""
+    c = conn()
+    row = c.execute("SELECT id, date, questions, idx, done FROM sessions WHERE uid=? ORDER BY id DESC LIMIT 1",
+                    (u,)).fetchone()
+    return _session(c, row) if row and not row[4] else None
+
+
+def _open_session(c, u, sess):
+    """Id of the session snapshot ``sess``: its own id, else the user's open one, else a new row"""
+    sid = sess.get("id")
+    if sid is None:
+        row = c.execute("SELECT id FROM sessions WHERE uid=? AND done=0 ORDER BY id DESC LIMIT 1", (u,)).fetchone()
+        sid = row[0] if row else None
+    if sid is None:
+        sid = c.execute("INSERT INTO sessions(uid, date, questions) VALUES (?, ?, ?)",
+                        (u, sess.get("date") or _now(), json.dumps(sess["questions"]))).lastrowid
+    return sid
+
+
+def saveAns(u, sess, pos, ans, fb):
+    """Append one answer and upsert its (partial) session in a single transaction.
+
+    Only the new answer row and the session header are written, so the cost
+    does not grow with the user's history and two tabs never overwrite each
+    other's answers. Returns the session id; keep it in ``sess["id"]``.
+    """
+    with tx() as c:
+        c.execute("INSERT OR IGNORE INTO users(uid, created) VALUES (?, ?)", (u, _now()))
+        sid = _open_session(c, u, sess)
+        c.execute("UPDATE sessions SET questions=?, idx=MAX(idx, ?), date=? WHERE id=?",
+                  (json.dumps(sess["questions"]), sess.get("idx", pos + 1), sess.get("date") or _now(), sid))
+        c.execute("INSERT OR REPLACE INTO answers(session_id, pos, answer, feedback) VALUES (?, ?, ?, ?)",
+                  (sid, pos, ans, json.dumps(fb)))
+    return sid
+
+
+def markDone(u, sess):
+    """Close a session and store its aggregates for the history view"""
+    with tx() as c:
+        sid = sess.get("id")
+        if sid is not None and c.execute("UPDATE sessions SET done=1 WHERE id=? AND uid=?", (sid, u)).rowcount:
+            _aggregate(c, sid)
+
+
+def saveUsr(u, d):
+    """Write a whole {"history": [...]} document (new users, legacy JSON import)"""
+    with tx() as c:
+        c.execute("INSERT OR IGNORE INTO users(uid, created) VALUES (?, ?)", (u, _now()))
+        for sess in d.get("history", []):
+            sid = sess.get("id")
+            if sid is None:
+                sid = c.execute("INSERT INTO sessions(uid, date, questions, idx, done) VALUES (?, ?, ?, ?, ?)",
+                                (u, sess.get("date") or _now(), json.dumps(sess.get("questions", [])),
+                                 sess.get("idx", 0), int(sess.get("done", True)))).lastrowid
+                sess["id"] = sid
+            else:
+                c.execute("UPDATE sessions SET questions=?, idx=?, done=? WHERE id=? AND uid=?",
+                          (json.dumps(sess.get("questions", [])), sess.get("idx", 0),
+                           int(sess.get("done", True)), sid, u))
+            for pos, (a, fb) in enumerate(zip(sess.get("answers", []), sess.get("feedback", []))):
+                c.execute("INSERT OR REPLACE INTO answers(session_id, pos, answer, feedback) VALUES (?, ?, ?, ?)",
+                          (sid, pos, a, json.dumps(fb)))
+            if sess.get("done", True):
+                _aggregate(c, sid)
+
+
+# History view: session headers page by page, details only on demand
+
+def countSess(u):
+    return conn().execute("SELECT COUNT(*) FROM sessions WHERE uid=?", (u,)).fetchone()[0]
+
+
+def listSess(u, offset=0, limit=10):
+    """Newest-first session headers with their stored aggregates (no answers)"""
+    rows = conn().execute(
+        "SELECT id, date, idx, done, n_answers, avg, avg_scores FROM sessions"
+        " WHERE uid=? ORDER BY id DESC LIMIT ? OFFSET ?", (u, limit, offset)).fetchall()
+    return [{"id": sid, "date": date, "idx": idx, "done": bool(done), "n_answers": n,
+             "avg": avg, "avg_scores": json.loads(avg_scores) if avg_scores else {}}
+            for sid, date, idx, done, n, avg, avg_scores in rows]
+
+
+def loadSess(u, sid):
+    c = conn()
+    row = c.execute("SELECT id, date, questions, idx, done FROM sessions WHERE id=? AND uid=?", (sid, u)).fetchone()
+    return _session(c, row) if row else None
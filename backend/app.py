@@ -1,14 +1,27 @@
-from fastapi import FastAPI
+from fastapi import FastAPI,File,HTTPException,Request,UploadFile
+from fastapi.responses import JSONResponse,Response,StreamingResponse
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from pathlib import Path
 import os 
-from groq import Groq
+import asyncio
+import json
+import hashlib
+import time
+from typing import Any,Dict,List,Optional
+from groq import AsyncGroq
 from fastapi.middleware.cors import CORSMiddleware
  
 load_dotenv()
 
-from utils import load_faqs,find_answer
+from utils import load_faqs,build_faq_index,find_answer,extract_skills,analyze_gap_fuzzy,init_skills,SUPPORTED_RESUME_TYPES
+from llm_cache import LLMCache,cache_key
+from prompts import evaluation_prompt,assessment_prompt,question_prompt,parse_questions,parse_rubric,overall_score,format_feedback
+from parse_service import get_resume_parser
+from jobs import JobStore
+from faq_semantic import DEFAULT_THRESHOLD,load_semantic_index
+from question_bank import load_question_bank
+from metrics import Registry,CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 app=FastAPI()
 
@@ -22,33 +35,430 @@ app.add_middleware(
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+METRICS=Registry()
+REQUEST_SECONDS=METRICS.histogram("interview_bot_request_duration_seconds","Total request time by route",["route"])
+IN_FLIGHT=METRICS.gauge("interview_bot_requests_in_flight","Requests currently being served")
+FAQ_MATCH_SECONDS=METRICS.histogram("interview_bot_faq_match_seconds","Time spent matching a question against the FAQ index")
+FAQ_LOOKUPS=METRICS.counter("interview_bot_faq_lookups_total","FAQ lookups by result",["result"])
+LLM_CACHE_LOOKUPS=METRICS.counter("interview_bot_llm_cache_lookups_total","LLM cache lookups by result",["result"])
+LLM_SECONDS=METRICS.histogram("interview_bot_llm_request_seconds","Upstream Groq latency",["mode"])
+LLM_TOKENS=METRICS.counter("interview_bot_llm_tokens_total","Tokens reported in Groq usage",["kind"])
+LLM_CALL_TOKENS=METRICS.histogram("interview_bot_llm_call_tokens","Tokens per Groq call by task",["task","kind"],
+                                  buckets=(64,128,256,512,1024,2048,4096,8192))
+ERRORS=METRICS.counter("interview_bot_errors_total","Errors by stage and exception type",["stage","type"])
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    start=time.perf_counter()
+    with IN_FLIGHT.track():
+        try:
+            response=await call_next(request)
+        except Exception as e:
+            ERRORS.inc(stage="request",type=type(e).__name__)
+            raise
+        finally:
+            route=request.scope.get("route")
+            REQUEST_SECONDS.observe(time.perf_counter()-start,route=getattr(route,"path","unmatched"))
+    return response
+
 load_dotenv(dotenv_path=BASE_DIR / ".env")
 
 
-client=Groq(api_key=os.getenv("GROQ_API_KEY"))
+client=AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+
+FAQS=build_faq_index(load_faqs(BASE_DIR/"data"/"faqs.json"))
+# Semantic FAQ tier (needs faiss-cpu): catches paraphrases the fuzzy match misses.
+# FAQ_SEMANTIC=0 turns it off; FAQ_INDEX_PATH="" skips persisting the index.
+if os.getenv("FAQ_SEMANTIC","1")!="0":
+    FAQS.semantic=load_semantic_index(
+        FAQS.faqs,
+        path=os.getenv("FAQ_INDEX_PATH", str(BASE_DIR/"data"/"faqs.faiss")) or None,
+        threshold=float(os.getenv("FAQ_SEMANTIC_THRESHOLD",str(DEFAULT_THRESHOLD))),
+    )
+ALL_SKILLS,_=init_skills(BASE_DIR/"data"/"skills.json")
+QUESTION_BANK=load_question_bank(BASE_DIR/"data"/"question_bank.json")
+
+MODEL="llama-3.1-8b-instant"
+
+# LLM_CACHE_PATH="" keeps the cache in memory only
+LLM_CACHE=LLMCache(
+    path=os.getenv("LLM_CACHE_PATH", str(BASE_DIR/"data"/"llm_cache.sqlite3")),
+    max_memory_entries=int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512")),
+    max_disk_entries=int(os.getenv("LLM_CACHE_DISK_ENTRIES", "50000")),
+    ttl=int(os.getenv("LLM_CACHE_TTL", str(7*24*3600))),
+)
+
+# Upper bound on concurrent upstream LLM calls per worker
+LLM_CONCURRENCY=int(os.getenv("LLM_CONCURRENCY","8"))
+_llm_slots=asyncio.Semaphore(LLM_CONCURRENCY)
+
+# Cache key -> task generating that completion, so identical concurrent
+# prompts share one upstream call
+_inflight: Dict[str, asyncio.Task]={}
+
+def _record_usage(usage,task):
+    if usage is None:
+        return
+    for kind in ("prompt","completion"):
+        tokens=getattr(usage,f"{kind}_tokens",None)
+        if isinstance(tokens,int):
+            LLM_TOKENS.inc(tokens,kind=kind)
+            LLM_CALL_TOKENS.observe(tokens,task=task,kind=kind)
+
+def _lookup_faq(question):
+    with FAQ_MATCH_SECONDS.time():
+        answer=find_answer(question,FAQS)
+    FAQ_LOOKUPS.inc(result="hit" if answer else "miss")
+    return answer
+
+async def _generate(key,messages,params,task,validate):
+    async with _llm_slots:
+        try:
+            with LLM_SECONDS.time(mode="blocking"):
+                response=await client.chat.completions.create(
+                    model=MODEL,
+                    messages=messages,
+                    **params,
+                )
+        except Exception as e:
+            ERRORS.inc(stage="llm",type=type(e).__name__)
+            raise
+    _record_usage(getattr(response,"usage",None),task)
+    answer=response.choices[0].message.content
+    if validate is None or validate(answer):
+        LLM_CACHE.set(key,answer)
+    return answer
+
+async def complete(messages,task="ask",validate=None,**params):
+    """Return (answer, source) for a chat completion, via the cache when possible.
+
+    ``task`` only labels the token metrics; it is not part of the cache key.
+    With ``validate``, replies it rejects are neither cached nor served from
+    the cache, so asking again makes a fresh call.
+    """
+    key=cache_key(MODEL,messages,**params)
+    # A disk-tier read can wait on SQLite; keep it off the event loop so
+    # FAQ answers never queue behind it (set only touches memory)
+    cached=await asyncio.to_thread(LLM_CACHE.get,key)
+    if cached is not None and validate is not None and not validate(cached):
+        cached=None
+    LLM_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached,"cache"
 
-FAQS=load_faqs(BASE_DIR/"data"/"faqs.json")
+    pending=_inflight.get(key)
+    if pending is None:
+        pending=asyncio.ensure_future(_generate(key,messages,params,task,validate))
+        _inflight[key]=pending
+        pending.add_done_callback(lambda _: _inflight.pop(key,None))
+    # A client disconnecting must not cancel the call other requests share
+    return await asyncio.shield(pending),None
+
+def _sse(payload,event=None):
+    """Encode one server-sent event; payloads are JSON so newlines survive."""
+    prefix=f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+async def _sse_answer(answer,source):
+    yield _sse({"delta":answer})
+    yield _sse({"source":source},event="done")
+
+async def _sse_completion(messages):
+    key=cache_key(MODEL,messages)
+    parts=[]
+    try:
+        async with _llm_slots:
+            with LLM_SECONDS.time(mode="stream"):
+                stream=await client.chat.completions.create(
+                    model=MODEL,
+                    messages=messages,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    delta=chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield _sse({"delta":delta})
+                    # Groq reports usage on the final chunk
+                    _record_usage(getattr(getattr(chunk,"x_groq",None),"usage",None),"ask")
+    except Exception as e:
+        ERRORS.inc(stage="llm",type=type(e).__name__)
+        yield _sse({"error":str(e)},event="error")
+        return
+    # An empty stream is not an answer worth serving again
+    if parts:
+        LLM_CACHE.set(key,"".join(parts))
+    yield _sse({"source":None},event="done")
 
 class QuestionRequest(BaseModel):
     question: str
+
+class QAItem(BaseModel):
+    question: str
+    answer: str = ""
+    skipped: bool = False
+    # Evaluation already produced for this answer; a valid rubric is reused, not regenerated
+    feedback: Optional[str] = None
+    rubric: Optional[Dict[str,Any]] = None
+
+class EvaluationRequest(BaseModel):
+    question: str
+    answer: str
+
+class BatchEvaluationRequest(BaseModel):
+    items: List[QAItem]
+    include_assessment: bool = True
+
+# Per-request cap on concurrent evaluations in /evaluate/batch
+BATCH_CONCURRENCY=int(os.getenv("BATCH_CONCURRENCY","4"))
+
+class GapRequest(BaseModel):
+    job_description: str
+    # Either the id returned by /parse or the resume text itself
+    resume_id: Optional[str] = None
+    resume_text: Optional[str] = None
+
+class QuestionSetRequest(BaseModel):
+    interview_type: str = "Mixed"
+    difficulty: str = "Medium"
+    count: int = 5
+    # Taxonomy skills in priority order, e.g. the JD's missing skills first
+    skills: List[str] = []
+    role: Optional[str] = None
+    seed: Optional[int] = None
+    # Context for LLM top-ups only; bank selection goes by skills
+    resume_text: Optional[str] = None
+    job_description: Optional[str] = None
+
+# Parse and gap results, keyed by content hash
+JOBS=JobStore(max_jobs=int(os.getenv("JOB_STORE_SIZE","256")),ttl=int(os.getenv("JOB_TTL","3600")))
+
+# Uploads up to this size are parsed before /parse returns; larger ones
+# get a job handle to poll
+PARSE_INLINE_BYTES=int(os.getenv("PARSE_INLINE_BYTES",str(2*1024*1024)))
+# What a failed parse tells the client; the detail (which can name server
+# paths) only goes to the log
+PARSE_ERRORS={
+    "timeout":"parsing took too long",
+    "memory":"the document is too large to parse",
+    "parse_error":"the document could not be read",
+    "crashed":"the parser crashed",
+}
+
+def _content_hash(data):
+    if isinstance(data,str):
+        data=data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+def _job_response(job):
+    return JSONResponse(job.to_dict(),status_code=202 if not job.finished.is_set() else 200)
     
 @app.get("/")
 def root():
     return {"message":"Interview Bot is running!"}
 
+@app.get("/health")
+def health():
+    """Readiness probe used by the launchers: FAQs and taxonomy are loaded."""
+    return {"status":"ok","faqs":len(FAQS),"skills":len(ALL_SKILLS),"questions":len(QUESTION_BANK)}
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return Response(METRICS.render(),media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/ask")
-def ask_question(request: QuestionRequest):
-    faq_answer=find_answer(request.question,FAQS)
+async def ask_question(request: QuestionRequest):
+    faq_answer=_lookup_faq(request.question)
     if faq_answer:
         return{"answer":faq_answer,"source":"faqs.json"}
     
-    response=client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[{"role":"user","content": request.question}],
-    )
-    return{"answer": response.choices[0].message.content}
+    answer,source=await complete([{"role":"user","content": request.question}])
+    if source:
+        return{"answer":answer,"source":source}
+    return{"answer": answer}
     
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """Same answer as /ask, relayed as server-sent events while it is generated."""
+    faq_answer=_lookup_faq(request.question)
+    if faq_answer:
+        events=_sse_answer(faq_answer,"faqs.json")
+    else:
+        messages=[{"role":"user","content": request.question}]
+        cached=await asyncio.to_thread(LLM_CACHE.get,cache_key(MODEL,messages))
+        LLM_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+        events=_sse_answer(cached,"cache") if cached is not None else _sse_completion(messages)
+    return StreamingResponse(events,media_type="text/event-stream")
+
+async def evaluate_answer(question,answer):
+    """(rubric, feedback) for one answer; rubric is None when the reply is not a valid rubric."""
+    reply,_=await complete([{"role":"user","content":evaluation_prompt(question,answer)}],task="evaluation",
+                           validate=lambda reply: parse_rubric(reply) is not None,
+                           response_format={"type":"json_object"})
+    rubric=parse_rubric(reply)
+    if rubric is None:
+        ERRORS.inc(stage="rubric",type="invalid")
+        return None,reply
+    return rubric,format_feedback(rubric)
+
+@app.post("/evaluate")
+async def evaluate_single(request: EvaluationRequest):
+    """Rubric and feedback for one answer."""
+    rubric,feedback=await evaluate_answer(request.question,request.answer)
+    return{"feedback":feedback,"rubric":rubric}
+
+@app.post("/evaluate/batch")
+async def evaluate_batch(request: BatchEvaluationRequest):
+    """Evaluate every answer of an interview concurrently and score the whole set.
+
+    The score is the mean of the answers' rubric scores, computed here
+    rather than by another pass over the transcript.
+    """
+    answered=[item for item in request.items if item.answer.strip() and not item.skipped]
+    limit=asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def evaluate(item):
+        # Re-validating a client-supplied rubric also recomputes its score
+        rubric=parse_rubric(json.dumps(item.rubric)) if item.rubric else None
+        if rubric:
+            return rubric,item.feedback or format_feedback(rubric)
+        async with limit:
+            try:
+                rubric,feedback=await evaluate_answer(item.question,item.answer)
+            except Exception as e:
+                ERRORS.inc(stage="evaluation",type=type(e).__name__)
+                print(f"Batch evaluation call failed: {e}")
+                return None,item.feedback
+        return rubric,feedback if rubric else item.feedback or feedback
+
+    async def assess():
+        if not (request.include_assessment and answered):
+            return None
+        async with limit:
+            try:
+                answer,_=await complete([{"role":"user","content":assessment_prompt([item.model_dump() for item in answered])}],
+                                        task="assessment")
+                return answer
+            except Exception as e:
+                ERRORS.inc(stage="assessment",type=type(e).__name__)
+                print(f"Batch assessment call failed: {e}")
+                return None
+
+    # The assessment only needs the answers, so it runs alongside the evaluations
+    evaluations,assessment=await asyncio.gather(
+        asyncio.gather(*[evaluate(item) for item in answered]),
+        assess(),
+    )
+    by_item=dict(zip(map(id,answered),evaluations))
+
+    return{
+        "results":[
+            {"question":item.question,"feedback":by_item.get(id(item),(None,None))[1],
+             "rubric":by_item.get(id(item),(None,None))[0]}
+            for item in request.items
+        ],
+        "score":overall_score([rubric for rubric,_ in evaluations]),
+        "assessment":assessment,
+    }
+
+@app.post("/parse")
+async def parse_upload(file: UploadFile = File(...)):
+    """Parse a PDF/DOCX resume; large uploads return a job id to poll."""
+    suffix=Path(file.filename or "").suffix.lower()
+    if suffix not in SUPPORTED_RESUME_TYPES:
+        raise HTTPException(status_code=415,detail="Only PDF and DOCX resumes are supported")
+    content=await file.read()
+    resume_id=_content_hash(content)
+
+    async def work():
+        parsed=await asyncio.to_thread(get_resume_parser().parse_bytes,content,suffix)
+        if not parsed.ok:
+            print(f"Resume parse failed ({parsed.error}): {parsed.detail}")
+            raise ValueError(PARSE_ERRORS.get(parsed.error,"the document could not be parsed"))
+        return {"resume_id":resume_id,"text":parsed.text,"elapsed":parsed.elapsed}
+
+    job=JOBS.submit(resume_id,work)
+    if len(content)<=PARSE_INLINE_BYTES:
+        await JOBS.wait(job,timeout=get_resume_parser().timeout+5)
+    return _job_response(job)
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str, wait: float = 0):
+    """Job state; with wait>0 this long-polls up to that many seconds (max 30)."""
+    job=JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404,detail="Unknown job id")
+    await JOBS.wait(job,timeout=min(wait,30))
+    return _job_response(job)
+
+@app.post("/gap")
+async def gap_analysis(request: GapRequest):
+    """Skill match score plus matched and missing JD skills for a resume."""
+    parsed=JOBS.get(request.resume_id) if request.resume_id else None
+    if parsed is not None and parsed.status=="done":
+        resume_text=parsed.result["text"]
+    elif request.resume_text is not None:
+        # Jobs are per worker, so the parse may have run on another one
+        resume_text=request.resume_text
+    elif request.resume_id:
+        raise HTTPException(status_code=404,detail="Resume not parsed yet")
+    else:
+        raise HTTPException(status_code=422,detail="resume_id or resume_text is required")
+
+    job_description=request.job_description
+
+    async def work():
+        def analyze():
+            # Extract JD skills once and share them with the gap analysis
+            jd_skills=extract_skills(job_description,ALL_SKILLS)
+            score,matched=analyze_gap_fuzzy(resume_text,job_description,set(ALL_SKILLS),jd_skills=jd_skills)
+            return{
+                "score":score,
+                "matched":sorted(matched),
+                "missing":sorted(jd_skills-matched),
+                "jd_skills":sorted(jd_skills),
+            }
+        return await asyncio.to_thread(analyze)
+
+    # Keyed on the text actually analyzed: a resume_id sent with different
+    # resume_text must not share another text's job
+    job=JOBS.submit(f"gap-{_content_hash(resume_text)}-{_content_hash(job_description)}",work)
+    await JOBS.wait(job,timeout=60)
+    if job.status=="failed":
+        raise HTTPException(status_code=500,detail=job.error)
+    return _job_response(job)
+
+@app.post("/questions")
+async def assemble_questions(request: QuestionSetRequest):
+    """Interview questions from the bank; the LLM only tops up what the bank lacks.
+
+    Skills with no bank question at all get generated questions in up to
+    half of the slots, and any shortfall in the count is generated too, in
+    a single LLM call.
+    """
+    count=max(1,min(request.count,20))
+    unknown=[] if request.interview_type=="Behavioral" else [
+        s for s in dict.fromkeys(skill.lower() for skill in request.skills) if s not in QUESTION_BANK.by_skill]
+    reserved=min(len(unknown),count//2)
+    selected,uncovered=QUESTION_BANK.select(request.interview_type,request.difficulty,request.skills,
+                                            count-reserved,role=request.role,seed=request.seed)
+    questions=[{**q,"source":"bank"} for q in selected]
+    wanted=count-len(questions)
+    if wanted:
+        llm_type="Behavioral" if request.interview_type=="Behavioral" else "Technical"
+        prompt=question_prompt(wanted,llm_type,request.difficulty,uncovered,
+                               request.resume_text or "",request.job_description or "")
+        try:
+            answer,_=await complete([{"role":"user","content":prompt}],task="questions")
+            generated=parse_questions(answer)[:wanted]
+        except Exception as e:
+            ERRORS.inc(stage="questions",type=type(e).__name__)
+            generated=[]
+        questions+=[{"question":q,"type":llm_type,"difficulty":request.difficulty,"skills":[],"source":"llm"}
+                    for q in generated]
+    return{"questions":questions,"uncovered":uncovered}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
-image.png
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+if __package__:
+    from .utils import normalize
+else:
+    from utils import normalize
+
+# Bump when the embedding changes so persisted indexes are rebuilt
+EMBEDDING_VERSION = 2
+DIM = 1024
+# Cosine similarity a paraphrase needs. One extra word on a short question
+# ("what is python 3") lands around 0.8, so this stays above that.
+DEFAULT_THRESHOLD = 0.85
+
+# Question scaffolding carries no meaning for matching: "what is python" and
+# "can you explain python" should both reduce to "python". Question words
+# other than "what" do ("why python" is not "what is python"), so they stay.
+STOPWORDS = frozenset(
+    "a an the is are was were be what whats do does did can could "
+    "would should will you your me my i we to of for in on about tell explain describe define "
+    "please meant mean means by with and or it its this that".split()
+)
+
+
+def _tokens(text: str) -> List[str]:
+    return [w for w in re.split(r"\s+", normalize(text)) if w and w not in STOPWORDS]
+
+
+def embed(texts, dim=DIM):
+    """Hashed bag of words and character trigrams, L2-normalized (float32 rows).
+
+    Computed locally and deterministically, so the FAQ side can be indexed
+    once and persisted while queries are embedded per request.
+    """
+    import numpy as np
+    vectors = np.zeros((len(texts), dim), dtype="float32")
+    for row, text in enumerate(texts):
+        for word in _tokens(text):
+            # Whole words dominate; trigrams absorb typos and inflections
+            features = [(word, 1.0)]
+            padded = f"<{word}>"
+            features += [(padded[i:i + 3], 0.5) for i in range(len(padded) - 2)]
+            for feature, weight in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % dim] += weight if h & 0x80000000 else -weight
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _fingerprint(faqs, dim):
+    payload = json.dumps([EMBEDDING_VERSION, dim, [faq["question"] for faq in faqs]], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SemanticFaqIndex:
+    """Inner-product FAISS index over FAQ question embeddings.
+
+    Plugs into ``FaqIndex.semantic``: ``best_match`` returns the closest FAQ
+    whose cosine similarity reaches ``threshold``, or None.
+    """
+
+    def __init__(self, index, faqs: List[Dict[str, str]], threshold=DEFAULT_THRESHOLD, k=3):
+        self.index = index
+        self.faqs = faqs
+        self.threshold = threshold
+        self.k = k
+
+    def search(self, question: str, k=None) -> List[Tuple[Dict[str, str], float]]:
+        """Top-k FAQs with their cosine similarity, best first."""
+        query = embed([question], self.index.d)
+        if not query.any():
+            return []
+        scores, ids = self.index.search(query, min(k or self.k, self.index.ntotal))
+        return [(self.faqs[i], float(s)) for s, i in zip(scores[0], ids[0]) if i >= 0]
+
+    def best_match(self, question: str) -> Optional[Tuple[Dict[str, str], float]]:
+        hits = self.search(question)
+        if hits and hits[0][1] >= self.threshold:
+            return hits[0]
+        return None
+
+
+def load_semantic_index(faqs: List[Dict[str, str]], path=None, threshold=DEFAULT_THRESHOLD, k=3, dim=DIM):
+    """Semantic tier for ``faqs``, or None when faiss is not installed.
+
+    With ``path``, the index is written there on first use (alongside a
+    ``.json`` fingerprint of the questions) and later workers memory-map it
+    instead of re-embedding; a changed FAQ file triggers a rebuild.
+    """
+    try:
+        import faiss
+    except ImportError:
+        return None
+    if not faqs:
+        return None
+
+    fingerprint = _fingerprint(faqs, dim)
+    index = None
+    if path:
+        path = Path(path)
+        meta_path = path.with_name(path.name + ".json")
+        try:
+            if json.loads(meta_path.read_text()).get("fingerprint") == fingerprint:
+                index = faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except (OSError, ValueError, RuntimeError):
+            index = None
+
+    if index is None:
+        index = faiss.IndexFlatIP(dim)
+        index.add(embed([faq["question"] for faq in faqs], dim))
+        if path:
+            # Write under a temporary name so concurrent workers never read a partial file
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            faiss.write_index(index, str(tmp))
+            os.replace(tmp, path)
+            tmp_meta = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+            tmp_meta.write_text(json.dumps({"fingerprint": fingerprint, "count": len(faqs)}))
+            os.replace(tmp_meta, meta_path)
+
+    return SemanticFaqIndex(index, faqs, threshold=threshold, k=k)
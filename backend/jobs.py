@@ -0,0 +1,86 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+
+class Job:
+    """One background computation; ``id`` is the content hash it was keyed on."""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = "pending"  # pending -> running -> done | failed
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished = asyncio.Event()
+
+    def to_dict(self):
+        return {"job_id": self.id, "status": self.status, "result": self.result, "error": self.error}
+
+
+class JobStore:
+    """Content-addressed background jobs with long-poll waiting.
+
+    Submitting an id that is already pending, running or done returns the
+    existing job, so identical uploads share one computation and its result.
+    Failed jobs are re-run on resubmission. The store keeps at most
+    ``max_jobs`` jobs and forgets finished ones after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_jobs=256, ttl=3600):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+        # The event loop only holds weak references to tasks; keep running
+        # jobs alive until they finish
+        self._tasks = set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and job.finished.is_set() and time.time() - job.created > self.ttl:
+            del self._jobs[job_id]
+            return None
+        return job
+
+    def submit(self, job_id: str, work: Callable[[], Awaitable[Any]]) -> Job:
+        job = self.get(job_id)
+        if job is not None and job.status != "failed":
+            self._jobs.move_to_end(job_id)
+            return job
+
+        job = Job(job_id)
+        self._jobs[job_id] = job
+        self._evict()
+        task = asyncio.ensure_future(self._run(job, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, work):
+        job.status = "running"
+        try:
+            job.result = await work()
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        finally:
+            job.finished.set()
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """Return once the job finishes or ``timeout`` seconds pass, whichever is first."""
+        if timeout > 0 and not job.finished.is_set():
+            try:
+                await asyncio.wait_for(job.finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def _evict(self):
+        # Oldest finished jobs go first; unfinished ones are never dropped
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].finished.is_set():
+                del self._jobs[job_id]
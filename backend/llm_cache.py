@@ -0,0 +1,143 @@
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def cache_key(model: str, messages, **params) -> str:
+    """Content address for a completion request: model, messages and sampling params."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Two-tier completion cache.
+
+    A bounded in-process LRU sits in front of an optional SQLite file that
+    every uvicorn worker on the host shares. Entries expire after ``ttl``
+    seconds and the disk tier is trimmed back to ``max_disk_entries``.
+
+    ``set`` only updates the memory tier and queues the disk write; one
+    writer thread batches queued writes into a transaction, so callers never
+    wait on a locked database or an fsync.
+    """
+
+    def __init__(self, path=None, max_memory_entries=512, max_disk_entries=50_000,
+                 ttl=7 * 24 * 3600):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()      # memory tier
+        self._db_lock = threading.Lock()   # SQLite connection
+        self._writes = 0
+        self._db = None
+        self._pending = queue.Queue()
+        if path:
+            self._db = sqlite3.connect(str(path), timeout=5, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # Under WAL, NORMAL only syncs at checkpoints; a crash can lose
+            # the last few cached completions, never corrupt the file
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS completions_created ON completions(created)")
+            self._db.commit()
+            threading.Thread(target=self._writer, name="llm-cache-writer", daemon=True).start()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                value, created = hit
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or self._expired(row[1]):
+            return None
+        with self._lock:
+            self._remember(key, row[0], row[1])
+        return row[0]
+
+    def set(self, key: str, value: str):
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+        if self._db is not None:
+            self._pending.put((key, value, created))
+
+    def _writer(self):
+        while True:
+            batch = [self._pending.get()]
+            while True:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._db_lock:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO completions (key, value, created) VALUES (?, ?, ?)", batch,
+                    )
+                    self._writes += len(batch)
+                    # Eviction scans are amortized over many writes
+                    if self._writes >= 100:
+                        self._writes = 0
+                        self._evict_disk()
+                    self._db.commit()
+            except sqlite3.Error as e:
+                # The memory tier still has the entries; the disk tier is best effort
+                with self._db_lock:
+                    self._db.rollback()
+                print(f"LLM cache write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+
+    def flush(self):
+        """Block until queued disk writes are committed."""
+        self._pending.join()
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM completions WHERE created < ?", (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM completions WHERE key IN ("
+            " SELECT key FROM completions ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def clear(self):
+        self.flush()
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM completions")
+                self._db.commit()
@@ -0,0 +1,228 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+if __package__:
+    from .utils import extract_resume_text, SUPPORTED_RESUME_TYPES
+else:
+    from utils import extract_resume_text, SUPPORTED_RESUME_TYPES
+
+try:
+    import resource
+except ImportError:  # not available on Windows; jobs run without a memory cap
+    resource = None
+
+
+@dataclass
+class ParseResult:
+    """Outcome of one parse job.
+
+    ``error`` is None on success, otherwise one of "unsupported", "timeout",
+    "memory", "parse_error" or "crashed"; ``detail`` carries the message.
+    """
+    ok: bool
+    text: str = ""
+    error: Optional[str] = None
+    detail: str = ""
+    elapsed: float = 0.0
+
+
+def _limit_memory(memory_limit_mb):
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _parse_job(file_path: str) -> ParseResult:
+    start = time.perf_counter()
+    try:
+        text = extract_resume_text(file_path)
+    except MemoryError:
+        return ParseResult(False, error="memory", detail="memory limit exceeded",
+                           elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return ParseResult(False, error="parse_error", detail=f"{type(e).__name__}: {e}",
+                           elapsed=time.perf_counter() - start)
+    return ParseResult(True, text=text, elapsed=time.perf_counter() - start)
+
+
+def _worker_main(conn, memory_limit_mb):
+    """Worker process loop: parse one file path per message until told to stop."""
+    _limit_memory(memory_limit_mb)
+    conn.send("ready")
+    while True:
+        try:
+            file_path = conn.recv()
+        except EOFError:
+            return
+        if file_path is None:
+            return
+        conn.send(_parse_job(file_path))
+
+
+class _Worker:
+    """One parser process and the pipe to it."""
+
+    def __init__(self, context, memory_limit_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def wait_ready(self, timeout):
+        try:
+            return self.conn.poll(timeout) and self.conn.recv() == "ready"
+        except (EOFError, OSError):
+            return False
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+def default_parse_workers():
+    """Cores divided among the uvicorn workers (WEB_CONCURRENCY), at least one.
+
+    Every uvicorn worker has its own parser, so a per-core default there
+    would start cores² parser processes.
+    """
+    web_workers = int(os.getenv("WEB_CONCURRENCY", "0") or 0) or 1
+    return max(1, (os.cpu_count() or 1) // web_workers)
+
+
+class ResumeParser:
+    """Parses resumes in a set of worker processes.
+
+    At most ``max_workers`` jobs run at once; the rest wait for a free
+    worker. Every job gets a hard wall-clock timeout that starts when a
+    worker picks it up, and runs under an address-space cap. A job that
+    overruns its timeout has its own worker killed and replaced, without
+    touching other jobs. A job whose worker dies under it is retried once
+    on a fresh worker. Workers are replaced after ``max_tasks_per_child``
+    documents.
+    """
+
+    # Time a fresh worker may take to start; not counted against the job
+    spawn_timeout = 60.0
+
+    def __init__(self, max_workers=None, timeout=30.0, memory_limit_mb=1024, max_tasks_per_child=20):
+        self.max_workers = max_workers or default_parse_workers()
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_tasks_per_child = max_tasks_per_child
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._workers = set()
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        worker = _Worker(self._context, self.memory_limit_mb)
+        with self._lock:
+            self._workers.add(worker)
+        if worker.wait_ready(self.spawn_timeout):
+            return worker
+        self._retire(worker, kill=True)
+        return None
+
+    def _checkin(self, worker):
+        worker.tasks += 1
+        if worker.tasks >= self.max_tasks_per_child:
+            self._retire(worker)
+        else:
+            with self._lock:
+                self._idle.append(worker)
+
+    def _retire(self, worker, kill=False):
+        with self._lock:
+            self._workers.discard(worker)
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+
+    def parse(self, file_path: str, timeout: Optional[float] = None) -> ParseResult:
+        if not str(file_path).endswith(SUPPORTED_RESUME_TYPES):
+            return ParseResult(False, error="unsupported", detail=f"Unsupported resume type: {file_path}")
+
+        timeout = self.timeout if timeout is None else timeout
+        detail = "worker failed to start"
+        for attempt in range(2):
+            with self._slots:
+                worker = self._checkout()
+                if worker is None:
+                    continue
+                start = time.perf_counter()
+                try:
+                    worker.conn.send(str(file_path))
+                    if not worker.conn.poll(timeout):
+                        self._retire(worker, kill=True)
+                        return ParseResult(False, error="timeout", detail=f"no result after {timeout}s",
+                                           elapsed=time.perf_counter() - start)
+                    result = worker.conn.recv()
+                except (EOFError, OSError):
+                    # The worker died mid-job (a crash or the memory cap)
+                    self._retire(worker, kill=True)
+                    detail = f"worker exited with code {worker.process.exitcode}"
+                    continue
+                self._checkin(worker)
+                return result
+        return ParseResult(False, error="crashed", detail=detail)
+
+    def parse_bytes(self, content: bytes, suffix: str) -> ParseResult:
+        """Parse an in-memory upload by spilling it to a temp file the workers can read."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+            tmp_file.write(content)
+            tmp_file_path = tmp_file.name
+        try:
+            return self.parse(tmp_file_path)
+        finally:
+            os.unlink(tmp_file_path)
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._workers, self._idle = list(self._workers), set(), []
+        for worker in workers:
+            worker.kill()
+
+
+_default_parser = None
+_default_lock = threading.Lock()
+
+
+def get_resume_parser() -> ResumeParser:
+    """Process-wide parser configured from PARSE_WORKERS, PARSE_TIMEOUT,
+    PARSE_MEMORY_MB and PARSE_MAX_TASKS."""
+    global _default_parser
+    with _default_lock:
+        if _default_parser is None:
+            _default_parser = ResumeParser(
+                max_workers=int(os.getenv("PARSE_WORKERS", "0")) or None,
+                timeout=float(os.getenv("PARSE_TIMEOUT", "30")),
+                memory_limit_mb=int(os.getenv("PARSE_MEMORY_MB", "1024")),
+                max_tasks_per_child=int(os.getenv("PARSE_MAX_TASKS", "20")),
+            )
+        return _default_parser
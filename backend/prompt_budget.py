@@ -0,0 +1,115 @@
+import math
+import re
+from typing import Dict, Iterable, List, Sequence
+
+if __package__:
+    from .utils import extract_skills
+else:
+    from utils import extract_skills
+
+# Prompt-token budgets per task: the text we send, not counting the reply.
+# They sit well inside the model context and keep latency and cost flat on
+# long resumes and transcripts.
+BUDGETS = {
+    "evaluation": 1200,
+    "questions": 1500,
+    "assessment": 3000,
+}
+
+_WORD = re.compile(r"\w+|[^\w\s]")
+# Resumes often come out of PDF/DOCX extraction as one long line, so
+# sections are cut at line breaks, bullets and sentence ends
+_SECTION_BREAK = re.compile(r"\n+|\s*[•●▪◦]\s*|(?<=[.!?;])\s+")
+SECTION_WORDS = 60
+
+
+def count_tokens(text: str) -> int:
+    """Estimated BPE token count: punctuation is one token, words one per ~4 characters.
+
+    Close enough to the Llama tokenizer for budgeting without shipping it.
+    """
+    return sum(math.ceil(len(tok) / 4) if tok[0].isalnum() or tok[0] == "_" else 1
+               for tok in _WORD.findall(text or ""))
+
+
+def truncate_to_tokens(text: str, budget: int, marker=" …") -> str:
+    """The longest word-aligned prefix of ``text`` within ``budget`` tokens."""
+    text = text or ""
+    if count_tokens(text) <= budget:
+        return text
+    words, used = [], count_tokens(marker)
+    for word in text.split():
+        cost = count_tokens(word)
+        if used + cost > budget:
+            break
+        words.append(word)
+        used += cost
+    return " ".join(words) + marker if words else ""
+
+
+def _sections(text: str) -> List[str]:
+    sections = []
+    for part in _SECTION_BREAK.split(text):
+        words = part.split()
+        for i in range(0, len(words), SECTION_WORDS):
+            sections.append(" ".join(words[i:i + SECTION_WORDS]))
+    return [s for s in sections if s]
+
+
+def compact_text(text: str, budget: int, skills: Iterable[str]) -> str:
+    """Fit ``text`` into ``budget`` tokens, keeping the sections most relevant to ``skills``.
+
+    Sections are ranked by how many distinct skills they mention (earlier
+    sections win ties), taken greedily until the budget is spent, and then
+    put back in document order.
+    """
+    text = text or ""
+    if count_tokens(text) <= budget:
+        return text
+    skills = set(skills)
+    sections = _sections(text)
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda i: (-len(extract_skills(sections[i], skills)) if skills else 0, i),
+    )
+    keep, used = set(), 0
+    separator = count_tokens(" … ")
+    for i in ranked:
+        cost = count_tokens(sections[i]) + separator
+        if used + cost <= budget:
+            keep.add(i)
+            used += cost
+    if not keep:
+        return truncate_to_tokens(text, budget)
+    return " … ".join(sections[i] for i in sorted(keep))
+
+
+def fit_transcript(items: Sequence[Dict[str, str]], budget: int,
+                   fields: Sequence[str] = ("answer", "feedback")) -> List[Dict[str, str]]:
+    """Copies of ``items`` whose ``fields`` fit ``budget`` tokens in total.
+
+    Items short enough to fit an equal share keep everything; the rest split
+    what is left. Within an item the first field (the candidate's answer)
+    keeps at least two thirds of its share and the other fields (prior
+    feedback) get the remainder.
+    """
+    items = [dict(item) for item in items]
+    cost = lambda item: sum(count_tokens(item.get(f) or "") for f in fields)
+    if not items or sum(cost(item) for item in items) <= budget:
+        return items
+
+    remaining, pending = budget, sorted(range(len(items)), key=lambda i: cost(items[i]))
+    while pending and cost(items[pending[0]]) <= remaining // len(pending):
+        remaining -= cost(items[pending.pop(0)])
+
+    share = remaining // len(pending)
+    head, tail = fields[0], fields[1:]
+    for i in pending:
+        item = items[i]
+        tail_cost = sum(count_tokens(item.get(f) or "") for f in tail)
+        item[head] = truncate_to_tokens(item.get(head) or "", share - min(tail_cost, share // 3))
+        left = share - count_tokens(item[head])
+        for field in tail:
+            item[field] = truncate_to_tokens(item.get(field) or "", left)
+            left -= count_tokens(item[field])
+    return items
@@ -0,0 +1,183 @@
+import json
+from typing import Dict, List, Optional
+
+if __package__:
+    from .prompt_budget import BUDGETS, compact_text, count_tokens, fit_transcript, truncate_to_tokens
+    from .utils import extract_skills, get_skills
+else:
+    from prompt_budget import BUDGETS, compact_text, count_tokens, fit_transcript, truncate_to_tokens
+    from utils import extract_skills, get_skills
+
+# Evaluation rubric: dimension -> weight in an answer's overall score.
+# Same dimensions as the prototype evaluator, scored 0-10 each.
+RUBRIC = {"Clarity": 0.3, "Tech": 0.4, "Comm": 0.3}
+
+
+def evaluation_prompt(question: str, answer: str, budget: Optional[int] = None) -> str:
+    budget = budget or BUDGETS["evaluation"]
+    answer = truncate_to_tokens(answer, budget - count_tokens(_evaluation_template(question, "")))
+    return _evaluation_template(question, answer)
+
+
+def _evaluation_template(question: str, answer: str) -> str:
+    return f"""
+    Evaluate this interview answer and provide constructive feedback:
+
+    Question: {question}
+    Answer: {answer}
+
+    Rate each dimension from 0 to 10:
+    - Clarity: structure and focus of the answer
+    - Tech: technical accuracy and depth
+    - Comm: communication, examples and specific details
+
+    Reply with ONLY a JSON object of this form:
+    {{"scores": {{"Clarity": 7, "Tech": 6, "Comm": 8}},
+     "strengths": ["..."], "improvements": ["..."], "tip": "one specific suggestion for a better answer"}}
+    """
+
+
+def assessment_prompt(items: List[Dict[str, str]], budget: Optional[int] = None) -> str:
+    """items: answered questions as {question, answer} dicts, trimmed to the assessment budget"""
+    budget = budget or BUDGETS["assessment"]
+    overhead = count_tokens(_assessment_template(_answers([{**item, "answer": ""} for item in items])))
+    return _assessment_template(_answers(fit_transcript(items, max(budget - overhead, 0), ("answer",))))
+
+
+def _answers(items):
+    return "\n\n".join([
+        f"Q: {item['question']}\nA: {item['answer']}"
+        for item in items
+    ])
+
+
+def _assessment_template(all_answers: str) -> str:
+    return f"""
+    Based on the following interview responses, provide a comprehensive assessment:
+
+    {all_answers}
+
+    Please provide:
+    1. Overall strengths demonstrated
+    2. Key areas for improvement
+    3. Specific recommendations for better interview performance
+    4. Relevant learning resources
+
+    Format as a structured assessment with clear sections.
+    """
+
+
+def question_prompt(count: int, interview_type: str, difficulty: str = "Medium", skills: List[str] = (),
+                    resume_text: str = "", job_description: str = "", budget: Optional[int] = None) -> str:
+    """Question-generation prompt with the resume and JD compacted to the budget.
+
+    The JD gets up to 40% of the room left after the instructions and keeps
+    its most skill-dense sections; the resume gets the rest and keeps the
+    sections that mention the JD's skills.
+    """
+    budget = budget or BUDGETS["questions"]
+    focus = f" Cover these skills: {', '.join(skills)}." if skills else ""
+    room = max(budget - count_tokens(_question_template(count, interview_type, difficulty, focus, "")), 0)
+    jd_skills = set(skills)
+    if job_description:
+        jd_skills |= extract_skills(job_description, get_skills())
+    context = ""
+    if job_description:
+        job_description = compact_text(job_description, int(room * 0.4), jd_skills)
+    if resume_text:
+        resume_text = compact_text(resume_text, room - count_tokens(job_description) - 10, jd_skills)
+        context += f"\n    Resume: {resume_text}\n"
+    if job_description:
+        context += f"\n    Job Description: {job_description}\n"
+    return _question_template(count, interview_type, difficulty, focus, context)
+
+
+def _question_template(count, interview_type, difficulty, focus, context):
+    return f"""
+    Generate {count} {difficulty.lower()} {interview_type.lower()} interview questions.{focus}
+    {context}
+    Each question should be specific and answerable in a few minutes.
+    Format each question on a new line starting with a number.
+    """
+
+
+def parse_questions(text: str) -> List[str]:
+    """Questions from a numbered ("1. ..." or "Q: ...") model reply."""
+    questions = []
+    for line in (text or "").split('\n'):
+        line = line.strip()
+        if line and (line[0].isdigit() or line.startswith('Q:')):
+            # Remove numbering and clean up
+            question = line.split('.', 1)[-1].strip()
+            if question.startswith('Q:'):
+                question = question[2:].strip()
+            if question:
+                questions.append(question)
+    return questions
+
+
+def _json_object(text: str):
+    """The outermost {...} in a model reply (which may wrap it in prose or a code fence)."""
+    start, end = (text or "").find("{"), (text or "").rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+
+def _strings(value) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [str(v).strip() for v in value if isinstance(v, (str, int, float)) and str(v).strip()]
+
+
+def parse_rubric(text: str) -> Optional[Dict]:
+    """Validated rubric from an evaluation reply, or None if it is not usable.
+
+    Every RUBRIC dimension must be a number; it is clamped to 0-10. The
+    result carries the weighted 0-100 ``score`` of the answer.
+    """
+    data = _json_object(text)
+    if not isinstance(data, dict) or not isinstance(data.get("scores"), dict):
+        return None
+    scores = {}
+    for dimension in RUBRIC:
+        value = data["scores"].get(dimension)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        scores[dimension] = min(max(float(value), 0.0), 10.0)
+    tip = data.get("tip")
+    return {
+        "scores": scores,
+        "strengths": _strings(data.get("strengths")),
+        "improvements": _strings(data.get("improvements")),
+        "tip": tip.strip() if isinstance(tip, str) else "",
+        "score": rubric_score(scores),
+    }
+
+
+def rubric_score(scores: Dict[str, float]) -> int:
+    """Weighted 0-100 score of one answer's 0-10 dimension scores."""
+    return round(sum(RUBRIC[d] * scores[d] for d in RUBRIC) / sum(RUBRIC.values()) * 10)
+
+
+def overall_score(rubrics: List[Optional[Dict]]) -> Optional[int]:
+    """Interview score: the mean of the answers' rubric scores, or None without any."""
+    scores = [r["score"] for r in rubrics if r]
+    return round(sum(scores) / len(scores)) if scores else None
+
+
+def format_feedback(rubric: Dict) -> str:
+    """Markdown feedback text for a rubric."""
+    lines = [f"**Score: {rubric['score']}/100** ("
+             + ", ".join(f"{d} {rubric['scores'][d]:g}/10" for d in RUBRIC) + ")"]
+    for title, key in (("Strengths", "strengths"), ("Areas for improvement", "improvements")):
+        if rubric[key]:
+            lines.append(f"\n{title}:\n" + "\n".join(f"- {item}" for item in rubric[key]))
+    if rubric["tip"]:
+        lines.append(f"\nTip: {rubric['tip']}")
+    return "\n".join(lines)
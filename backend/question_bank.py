@@ -0,0 +1,248 @@
+"""
+Tagged interview question bank
+
+Questions live in data/question_bank.json with their type, difficulty,
+taxonomy skills and roles, and are indexed on each tag so an interview can
+be assembled without an LLM call. Fill the bank offline:
+
+    python backend/question_bank.py stats
+    python backend/question_bank.py fill --per-skill 2
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+if __package__:
+    from .utils import BASE_DIR, get_skills
+    from .prompts import question_prompt, parse_questions
+else:
+    from utils import BASE_DIR, get_skills
+    from prompts import question_prompt, parse_questions
+
+QUESTION_BANK_PATH = BASE_DIR / "data" / "question_bank.json"
+TYPES = ("Technical", "Behavioral")
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+
+def question_id(text: str) -> str:
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()[:12]
+
+
+def _difficulty_order(difficulty: str) -> List[str]:
+    """The requested difficulty first, then the others by distance from it."""
+    if difficulty not in DIFFICULTIES:
+        difficulty = "Medium"
+    pos = DIFFICULTIES.index(difficulty)
+    return sorted(DIFFICULTIES, key=lambda d: (abs(DIFFICULTIES.index(d) - pos), DIFFICULTIES.index(d)))
+
+
+class QuestionBank:
+    """Questions with inverted indexes on skill, type, difficulty and role.
+
+    Each index maps a tag value to positions in ``questions``; questions
+    without skills are the generic pool used once skill questions run out.
+    """
+
+    def __init__(self, questions: Iterable[Dict] = ()):
+        self.questions: List[Dict] = []
+        self.by_skill = defaultdict(list)
+        self.by_type = defaultdict(list)
+        self.by_difficulty = defaultdict(list)
+        self.by_role = defaultdict(list)
+        self._ids = set()
+        self.add(questions)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def add(self, questions: Iterable[Dict]) -> int:
+        """Index new questions, skipping ones already in the bank; returns how many were added."""
+        added = 0
+        for q in questions:
+            q = dict(q)
+            q["id"] = q.get("id") or question_id(q["question"])
+            q["skills"] = [s.lower() for s in q.get("skills", [])]
+            q["roles"] = q.get("roles") or ["any"]
+            if q["id"] in self._ids:
+                continue
+            pos = len(self.questions)
+            self.questions.append(q)
+            self._ids.add(q["id"])
+            self.by_type[q["type"]].append(pos)
+            self.by_difficulty[q["difficulty"]].append(pos)
+            for skill in q["skills"]:
+                self.by_skill[skill].append(pos)
+            for role in q["roles"]:
+                self.by_role[role].append(pos)
+            added += 1
+        return added
+
+    def _pool(self, positions, interview_type, difficulty, role, rng):
+        pool = [
+            p for p in positions
+            if self.questions[p]["type"] == interview_type
+            and self.questions[p]["difficulty"] == difficulty
+            and (role is None or role in self.questions[p]["roles"] or "any" in self.questions[p]["roles"])
+        ]
+        if rng is not None:
+            rng.shuffle(pool)
+        return pool
+
+    def _pick(self, interview_type, difficulty, skills, count, role, rng, taken):
+        picked = []
+        covered = set()
+        for level in _difficulty_order(difficulty):
+            # Round-robin across skills so every requested skill gets a question
+            # before any skill gets a second one
+            pools = [(s, self._pool(self.by_skill.get(s, ()), interview_type, level, role, rng)) for s in skills]
+            while len(picked) < count and any(pool for _, pool in pools):
+                for skill, pool in pools:
+                    while pool and pool[0] in taken:
+                        pool.pop(0)
+                    if pool and len(picked) < count:
+                        p = pool.pop(0)
+                        taken.add(p)
+                        picked.append(p)
+                        covered.update(set(self.questions[p]["skills"]) & set(skills))
+        # Then generic questions, then questions on other skills
+        generic = [p for p in self.by_type.get(interview_type, ()) if not self.questions[p]["skills"]]
+        for positions in (generic, self.by_type.get(interview_type, ())):
+            for level in _difficulty_order(difficulty):
+                for p in self._pool(positions, interview_type, level, role, rng):
+                    if len(picked) >= count:
+                        break
+                    if p not in taken:
+                        taken.add(p)
+                        picked.append(p)
+        return picked, covered
+
+    def select(self, interview_type: str, difficulty: str, skills: List[str], count: int,
+               role: Optional[str] = None, seed: Optional[int] = None) -> Tuple[List[Dict], List[str]]:
+        """Assemble up to ``count`` questions for an interview.
+
+        ``skills`` are taxonomy skills in priority order. Technical questions
+        cover them round-robin, preferring the requested difficulty, then
+        generic questions and finally other skills' questions fill the rest;
+        "Mixed" alternates Technical and Behavioral. Returns the questions
+        and the skills no question covers.
+        """
+        skills = [s.lower() for s in dict.fromkeys(skills)]
+        rng = random.Random(seed) if seed is not None else None
+        taken = set()
+        if interview_type == "Mixed":
+            plan = [("Technical", (count + 1) // 2), ("Behavioral", count // 2)]
+        else:
+            plan = [(interview_type, count)]
+
+        picked_by_type, covered = {}, set()
+        for qtype, n in plan:
+            picked, got = self._pick(qtype, difficulty, skills if qtype == "Technical" else [], n, role, rng, taken)
+            picked_by_type[qtype] = picked
+            covered |= got
+
+        if interview_type == "Mixed":
+            tech, beh = picked_by_type["Technical"], picked_by_type["Behavioral"]
+            order = [p for pair in zip(tech, beh) for p in pair] + tech[len(beh):] + beh[len(tech):]
+        else:
+            order = picked_by_type[interview_type]
+        uncovered = [s for s in skills if s not in covered] if interview_type != "Behavioral" else []
+        return [self.questions[p] for p in order], uncovered
+
+    def coverage(self) -> Dict[str, Dict[str, int]]:
+        """Technical question count per skill and difficulty."""
+        counts = defaultdict(lambda: dict.fromkeys(DIFFICULTIES, 0))
+        for skill, positions in self.by_skill.items():
+            for p in positions:
+                q = self.questions[p]
+                if q["type"] == "Technical":
+                    counts[skill][q["difficulty"]] += 1
+        return counts
+
+    def save(self, path=QUESTION_BANK_PATH):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.questions, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def load_question_bank(path=QUESTION_BANK_PATH) -> QuestionBank:
+    if not os.path.exists(path):
+        return QuestionBank()
+    with open(path, "r", encoding="utf-8") as f:
+        return QuestionBank(json.load(f))
+
+
+# --- Offline bulk fill ----------------------------------------------------
+
+def _stats(bank):
+    coverage = bank.coverage()
+    taxonomy = sorted(set(get_skills()))
+    print(f"{len(bank)} questions ({len(bank.by_type['Technical'])} technical, "
+          f"{len(bank.by_type['Behavioral'])} behavioral)")
+    for skill in taxonomy:
+        counts = coverage.get(skill, dict.fromkeys(DIFFICULTIES, 0))
+        print(f"  {skill:<18} " + "  ".join(f"{d}={counts[d]}" for d in DIFFICULTIES))
+    unknown = sorted(set(bank.by_skill) - set(taxonomy))
+    if unknown:
+        print("Tags not in the taxonomy:", ", ".join(unknown))
+
+
+def _fill(bank, args):
+    from dotenv import load_dotenv
+    from groq import Groq
+    load_dotenv(BASE_DIR / ".env")
+    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    coverage = bank.coverage()
+    skills = [s.lower() for s in args.skills] if args.skills else sorted(set(get_skills()))
+    added = 0
+    for skill in skills:
+        for difficulty in args.difficulty:
+            missing = args.per_skill - coverage.get(skill, {}).get(difficulty, 0)
+            if missing <= 0:
+                continue
+            print(f"{skill} / {difficulty}: generating {missing}", flush=True)
+            if args.dry_run:
+                continue
+            try:
+                response = client.chat.completions.create(
+                    model=args.model,
+                    messages=[{"role": "user", "content": question_prompt(missing, "Technical", difficulty, [skill])}],
+                )
+            except Exception as e:
+                print(f"  failed: {e}", file=sys.stderr)
+                continue
+            questions = parse_questions(response.choices[0].message.content)[:missing]
+            added += bank.add({"question": q, "type": "Technical", "difficulty": difficulty,
+                               "skills": [skill], "roles": ["any"]} for q in questions)
+            # Save as we go so an interrupted run keeps what it paid for
+            bank.save(args.path)
+    print(f"Added {added} questions; bank now has {len(bank)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=str(QUESTION_BANK_PATH))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="questions per taxonomy skill and difficulty")
+    fill = commands.add_parser("fill", help="generate questions for under-covered skills with the LLM")
+    fill.add_argument("--per-skill", type=int, default=2, help="target questions per skill and difficulty")
+    fill.add_argument("--skills", nargs="*", help="only these skills (default: the whole taxonomy)")
+    fill.add_argument("--difficulty", nargs="*", default=list(DIFFICULTIES), choices=DIFFICULTIES)
+    fill.add_argument("--model", default=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"))
+    fill.add_argument("--dry-run", action="store_true", help="only print what would be generated")
+    args = parser.parse_args()
+
+    bank = load_question_bank(args.path)
+    if args.command == "stats":
+        _stats(bank)
+    else:
+        _fill(bank, args)
+
+
+if __name__ == "__main__":
+    main()
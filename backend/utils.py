@@ -1,11 +1,12 @@
 import json
 import os
-from typing import List,Dict,Optional
-from rapidfuzz import fuzz
+from typing import List,Dict,Optional,Tuple
 import string
-from PyPDF2 import PdfReader
-from docx import Document
-from itertools import islice
+import re
+from functools import lru_cache
+
+# rapidfuzz, PyPDF2 and python-docx are imported inside the functions that
+# use them, so importing this module stays cheap for workers and the UI
 
 def load_faqs(filepath:str) ->List[Dict[str,str]]:
     """returns a list of directories"""
@@ -28,71 +29,259 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 SKILLS_PATH = BASE_DIR / "data" / "skills.json"
 
-skills_json = load_skills(SKILLS_PATH)
+_taxonomy = None
+
+def init_skills(json_path=SKILLS_PATH) -> Tuple[List[str], int]:
+    """Load the skill taxonomy; returns (all_skills, max_words_in_skill)."""
+    global _taxonomy
+    skills_json = load_skills(json_path)
+
+    # Flatten all skills for easier matching
+    all_skills = [skill.lower() for category in skills_json.values() for skill in category]
 
-# Flatten all skills for easier matching
-all_skills = [skill.lower() for category in skills_json.values() for skill in category]
+    if all_skills:
+        max_words_in_skill = max(len(skill.split()) for skill in all_skills)
+    else:
+        max_words_in_skill = 1  # fallback
+        print("Warning: No skills found in skills.json. Gap analysis may not work properly.")
+    _taxonomy = (all_skills, max_words_in_skill)
+    return _taxonomy
 
-if all_skills:
-    max_words_in_skill = max(len(skill.split()) for skill in all_skills)
-else:
-    max_words_in_skill = 1  # fallback
-    print("Warning: No skills found in skills.json. Gap analysis may not work properly.")
+def get_skills() -> List[str]:
+    """The flattened taxonomy, loaded on first use."""
+    return (_taxonomy or init_skills())[0]
+
+def __getattr__(name):
+    # Module-level all_skills/max_words_in_skill are resolved lazily
+    if name == "all_skills":
+        return get_skills()
+    if name == "max_words_in_skill":
+        return (_taxonomy or init_skills())[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def normalize(text: str) -> str:
     return text.lower().translate(str.maketrans("", "", string.punctuation)).strip()
 
+# Tokens for skill matching: words may carry +, # and inner dots ("c++",
+# "c#", "node.js", ".net"); any other non-space character is a token of its own
+_SKILL_TOKEN = re.compile(r"\.?[\w+#]+(?:\.[\w+#]+)*|\S")
+
+
+@lru_cache(maxsize=16)
+def _skill_trie(skills: frozenset):
+    """Trie of the skills' token sequences and its depth."""
+    trie, depth = {}, 1
+    for skill in skills:
+        tokens = _SKILL_TOKEN.findall(skill)
+        if not tokens:
+            continue
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[None] = " ".join(skill.split())
+        depth = max(depth, len(tokens))
+    return trie, depth
+
+
+def extract_skills(text: str, skills) -> set:
+    """Skills from the taxonomy that appear in text as whole tokens, in one pass.
+
+    The text is tokenized once and each token start is walked down a trie
+    of skill token sequences, keeping the longest skill found there, so the
+    cost grows with the text length and not with the taxonomy size.
+    """
+    skills = frozenset(skills)
+    if not skills or not text:
+        return set()
+    trie, depth = _skill_trie(skills)
+    tokens = _SKILL_TOKEN.findall(text.lower())
+    found = set()
+    for i in range(len(tokens)):
+        node, longest = trie, None
+        for j in range(i, min(i + depth, len(tokens))):
+            node = node.get(tokens[j])
+            if node is None:
+                break
+            longest = node.get(None, longest)
+        if longest is not None:
+            found.add(longest)
+    return found
+
 def generate_ngrams(words_list, n):
     return [" ".join(words_list[i:i+n]) for i in range(len(words_list)-n+1)]
 
 
-def find_answer(user_question: str, faqs: List[Dict[str, str]]) -> Optional[str]:
-    user_norm = normalize(user_question)
-    for faq in faqs:
-        # Compare lowercase versions
-        faq_norm = normalize(faq["question"])
-        score = fuzz.ratio(user_norm, faq_norm)
-        if score >= 85:
-            return faq["answer"]
+class FaqIndex:
+    """FAQ entries with their questions normalized once, up front.
+
+    ``semantic`` is an optional second tier (see faq_semantic.py) with a
+    ``best_match(question) -> (faq, similarity) | None`` method, consulted
+    when no question is a close enough character-level match.
+    """
+
+    def __init__(self, faqs: List[Dict[str, str]], semantic=None):
+        self.faqs = faqs
+        self.keys = [normalize(faq["question"]) for faq in faqs]
+        self.semantic = semantic
+
+    def __len__(self):
+        return len(self.faqs)
+
+    def best_match(self, user_question: str, threshold=85) -> Optional[Tuple[Dict[str, str], float]]:
+        """Return the highest-scoring FAQ and its score (0-100), or None below threshold."""
+        if not self.keys:
+            return None
+        from rapidfuzz import fuzz, process
+        match = process.extractOne(
+            normalize(user_question), self.keys,
+            scorer=fuzz.ratio, processor=None, score_cutoff=threshold,
+        )
+        if match is not None:
+            _, score, idx = match
+            return self.faqs[idx], score
+        if self.semantic is not None:
+            hit = self.semantic.best_match(user_question)
+            if hit is not None:
+                return hit[0], hit[1] * 100
+        return None
+
+
+def build_faq_index(faqs: List[Dict[str, str]], semantic=None) -> FaqIndex:
+    return FaqIndex(faqs, semantic)
+
+
+def find_answer(user_question: str, faqs) -> Optional[str]:
+    """Answer from the best matching FAQ; accepts a FaqIndex or a raw FAQ list."""
+    index = faqs if isinstance(faqs, FaqIndex) else build_faq_index(faqs)
+    match = index.best_match(user_question)
+    if match:
+        return match[0]["answer"]
     return None
 
+SUPPORTED_RESUME_TYPES = (".pdf", ".docx")
+
+def extract_resume_text(file_path: str) -> str:
+    """Text of a PDF/DOCX resume; unlike parse_resume, errors propagate."""
+    if file_path.endswith(".pdf"):
+        from PyPDF2 import PdfReader
+        reader=PdfReader(file_path)
+        return " ".join([page.extract_text() or "" for page in reader.pages])
+    if file_path.endswith(".docx"):
+        from docx import Document
+        doc=Document(file_path)
+        return " ".join([para.text for para in doc.paragraphs])
+    raise ValueError(f"Unsupported resume type: {file_path}")
+
 def parse_resume(file_path: str) -> str:
     text=""
     try:
-        if file_path.endswith(".pdf"):
-         reader=PdfReader(file_path)
-         text=" ".join([page.extract_text() for page in reader.pages])
-        elif file_path.endswith(".docx"):
-         doc=Document(file_path)
-         text=" ".join([para.text for para in doc.paragraphs]) 
+        if file_path.endswith(SUPPORTED_RESUME_TYPES):
+         text=extract_resume_text(file_path)
     except Exception as e:
         print(f"Error parsing {file_path}:{e}")
     return text
 
-def analyze_gap_fuzzy(resume_text: str, jd_text: str, all_skills: set, threshold=85):
+# Punctuation peeled off resume tokens before exact skill lookup; "+", "#"
+# and inner dots are kept so "c++", "c#" and "node.js" still match.
+_TOKEN_EDGE_CHARS = ",;:!?()[]{}<>\"'|/*"
+_FUZZY_CHUNK = 8192
+
+
+def _token(word: str) -> str:
+    return word.strip(_TOKEN_EDGE_CHARS).rstrip(".")
+
+
+class SkillMatcher:
+    """Finds which of a set of skills occur in a resume.
+
+    Exact hits are resolved in one pass over the resume tokens with a trie
+    of skill token sequences. Only the skills left over are fuzzy scored,
+    with one vectorized rapidfuzz cdist call against the resume n-grams.
+    """
+
+    def __init__(self, skills):
+        self.skills = sorted(set(skills))
+        self.max_words = max((len(skill.split()) for skill in self.skills), default=1)
+        self._trie = {}
+        for skill in self.skills:
+            node = self._trie
+            for word in skill.split():
+                node = node.setdefault(word, {})
+            node[None] = skill
+
+    def _exact(self, tokens):
+        positions = {}
+        for i in range(len(tokens)):
+            node = self._trie
+            for j in range(i, min(i + self.max_words, len(tokens))):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                skill = node.get(None)
+                if skill is not None and skill not in positions:
+                    positions[skill] = (i, j + 1)
+        return positions
+
+    def _fuzzy(self, skills, words, threshold):
+        from rapidfuzz import fuzz, process
+
+        # First occurrence of every distinct n-gram, mapped to its word span
+        grams = {}
+        for n in range(1, self.max_words + 1):
+            for i in range(len(words) - n + 1):
+                grams.setdefault(" ".join(words[i:i + n]), (i, i + n))
+        gram_list = list(grams)
+
+        positions = {}
+        best = [0.0] * len(skills)
+        for start in range(0, len(gram_list), _FUZZY_CHUNK):
+            chunk = gram_list[start:start + _FUZZY_CHUNK]
+            scores = process.cdist(skills, chunk, scorer=fuzz.ratio,
+                                   score_cutoff=threshold, workers=-1)
+            top_cols = scores.argmax(axis=1)
+            for row, col in enumerate(top_cols):
+                score = scores[row, col]
+                if score >= threshold and score > best[row]:
+                    best[row] = score
+                    positions[skills[row]] = grams[chunk[col]]
+        return positions
+
+    def match(self, resume_text: str, threshold=85, return_positions=False):
+        """Return the matched skills, or a {skill: (start, end)} word-span map.
+
+        Spans index into ``resume_text.lower().split()``.
+        """
+        words = resume_text.lower().split()
+        positions = self._exact([_token(word) for word in words])
+        leftover = [skill for skill in self.skills if skill not in positions]
+        if leftover and words:
+            positions.update(self._fuzzy(leftover, words, threshold))
+        return positions if return_positions else set(positions)
+
+
+@lru_cache(maxsize=64)
+def get_skill_matcher(skills: frozenset) -> SkillMatcher:
+    return SkillMatcher(skills)
+
+
+def analyze_gap_fuzzy(resume_text: str, jd_text: str, all_skills: set, threshold=85,
+                      return_positions=False, jd_skills=None):
     resume_text = resume_text.lower()
     jd_text = jd_text.lower()
     if not resume_text or not jd_text:
-       return 0, set()
+       return (0, set(), {}) if return_positions else (0, set())
 
-    matched = set()
-    jd_skills_in_text = {skill for skill in all_skills if skill in jd_text}
-    
-    resume_words = resume_text.split()
+    # Callers that already extracted the JD skills pass them in to skip a rescan
+    jd_skills_in_text = set(jd_skills) if jd_skills is not None else extract_skills(jd_text, all_skills)
+
+    positions = get_skill_matcher(frozenset(jd_skills_in_text)).match(
+        resume_text, threshold, return_positions=True
+    )
+    matched = set(positions)
 
-    # Check n-grams from 1 to max_words_in_skill
-    ngrams = []
-    for n in range(1, max_words_in_skill+1):
-        ngrams.extend(generate_ngrams(resume_words, n))
-    
-    # Fuzzy match each JD skill against n-grams
-    for skill in jd_skills_in_text:
-        for gram in ngrams:
-            if fuzz.ratio(skill, gram) >= threshold:
-                matched.add(skill)
-                break  # no need to match the same skill multiple times
-    
     score = (len(matched) / len(jd_skills_in_text) * 100) if jd_skills_in_text else 0
+    if return_positions:
+        return score, matched, positions
     return score, matched
 
 
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the CPU hot paths in backend.utils
+
+Times find_answer, generate_ngrams, analyze_gap_fuzzy and parse_resume on
+synthetic data (FAQ sets, skill taxonomies, multi-page PDF/DOCX resumes)
+plus samples/resume.pdf, and writes the results as JSON.
+
+    python benchmarks/bench_hotpaths.py --output bench.json
+    python benchmarks/bench_hotpaths.py --baseline bench.json --max-regression 0.25
+
+With --baseline, any case whose median time grew by more than
+--max-regression (a fraction) makes the run exit with status 1.
+--quick uses smaller sizes for a fast smoke run.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.utils import (  # noqa: E402
+    analyze_gap_fuzzy, build_faq_index, find_answer, generate_ngrams,
+    get_skills, parse_resume,
+)
+
+WORDS = (
+    "built designed led migrated optimized deployed scaled automated reduced improved "
+    "service platform pipeline dashboard api cluster latency throughput customers team "
+    "data model feature release incident review mentoring roadmap budget quality tests "
+    "the a of and with for on in to across using while during through"
+).split()
+WORDS_PER_PAGE = 450
+
+
+# --- Synthetic data -------------------------------------------------------
+
+def synthetic_faqs(n, rng):
+    faqs = []
+    for i in range(n):
+        topic = " ".join(rng.choices(WORDS, k=rng.randint(3, 8)))
+        faqs.append({"question": f"What is {topic} number {i}?", "answer": f"Answer {i}"})
+    return faqs
+
+
+def synthetic_taxonomy(n, rng):
+    """The real skills first, padded with generated one- to three-word skills"""
+    skills = list(dict.fromkeys(get_skills()))[:n]
+    while len(skills) < n:
+        words = rng.randint(1, 3)
+        skills.append(" ".join(f"tech{rng.randint(0, 99999)}" for _ in range(words)))
+    return skills
+
+
+def synthetic_resume_text(pages, taxonomy, rng):
+    words = []
+    for _ in range(pages * WORDS_PER_PAGE):
+        # Roughly one word in twenty is a skill, some with trailing punctuation
+        if rng.random() < 0.05:
+            words.append(rng.choice(taxonomy) + rng.choice(["", ",", "."]))
+        else:
+            words.append(rng.choice(WORDS))
+    return " ".join(words)
+
+
+def synthetic_jd(taxonomy, rng, skills=40):
+    picked = rng.sample(taxonomy, min(skills, len(taxonomy)))
+    return "We are hiring engineers with " + ", ".join(picked) + " experience."
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages_text):
+    """Minimal text-only PDF (Helvetica, one content stream per page)"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in pages_text:
+        words = text.split()
+        lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+        body = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({_pdf_escape(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(body.encode('latin-1'))} >>\nstream\n{body}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    Path(path).write_bytes(bytes(out))
+
+
+def write_docx(path, pages_text):
+    from docx import Document
+    doc = Document()
+    for text in pages_text:
+        words = text.split()
+        for i in range(0, len(words), 60):
+            doc.add_paragraph(" ".join(words[i:i + 60]))
+    doc.save(str(path))
+
+
+# --- Timing ---------------------------------------------------------------
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "repeat": repeat}
+
+
+def run(quick=False, seed=1234):
+    rng = random.Random(seed)
+    repeat = 3 if quick else 5
+    faq_sizes = [1_000, 10_000] if quick else [10_000, 100_000]
+    taxonomy_sizes = [100, 1_000] if quick else [100, 1_000, 10_000]
+    page_counts = [1, 10] if quick else [1, 10, 50]
+    results = {}
+
+    def record(name, fn, times=repeat):
+        results[name] = measure(fn, times)
+        print(f"{name:<48} median {results[name]['median'] * 1000:10.2f} ms")
+
+    for n in faq_sizes:
+        faqs = synthetic_faqs(n, rng)
+        queries = [faq["question"] for faq in rng.sample(faqs, 10)] + ["Something nobody asked?"] * 10
+        record(f"find_answer/build_index/faqs={n}", lambda: build_faq_index(faqs))
+        index = build_faq_index(faqs)
+        record(f"find_answer/20_queries/faqs={n}", lambda: [find_answer(q, index) for q in queries])
+
+    taxonomy_full = synthetic_taxonomy(max(taxonomy_sizes), rng)
+    resumes = {pages: synthetic_resume_text(pages, taxonomy_full, rng) for pages in page_counts}
+
+    for pages, text in resumes.items():
+        words = text.lower().split()
+        record(f"generate_ngrams/n=1..3/pages={pages}",
+               lambda: [generate_ngrams(words, n) for n in (1, 2, 3)])
+
+    for size in taxonomy_sizes:
+        taxonomy = taxonomy_full[:size]
+        jd = synthetic_jd(taxonomy, rng)
+        for pages, text in resumes.items():
+            record(f"analyze_gap_fuzzy/skills={size}/pages={pages}",
+                   lambda: analyze_gap_fuzzy(text, jd, set(taxonomy)))
+
+    sample = ROOT / "samples" / "resume.pdf"
+    if sample.exists():
+        record("parse_resume/samples/resume.pdf", lambda: parse_resume(str(sample)))
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in page_counts:
+            pages_text = [synthetic_resume_text(1, taxonomy_full, rng) for _ in range(pages)]
+            pdf_path = Path(tmp) / f"resume_{pages}.pdf"
+            docx_path = Path(tmp) / f"resume_{pages}.docx"
+            write_pdf(pdf_path, pages_text)
+            write_docx(docx_path, pages_text)
+            record(f"parse_resume/pdf/pages={pages}", lambda: parse_resume(str(pdf_path)))
+            record(f"parse_resume/docx/pages={pages}", lambda: parse_resume(str(docx_path)))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, max_regression):
+    """Cases whose median slowed down by more than max_regression"""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        now = current["results"].get(name)
+        if now is None or base["median"] <= 0:
+            continue
+        ratio = now["median"] / base["median"]
+        if ratio > 1 + max_regression:
+            regressions.append((name, base["median"], now["median"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="results JSON from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed slowdown of a median vs. the baseline, as a fraction (default 0.25)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    current = run(quick=args.quick, seed=args.seed)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(current, json.loads(args.baseline.read_text()), args.max_regression)
+        if regressions:
+            print(f"\nRegressions over {args.max_regression:.0%}:")
+            for name, before, after, ratio in regressions:
+                print(f"  {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
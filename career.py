@@ -1,27 +1,54 @@
 import streamlit as st
-import base64
-from io import BytesIO
-from PIL import Image
 import time
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
 import json
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import tempfile
-from backend.utils import parse_resume, analyze_gap_fuzzy, load_skills
+from backend.prompts import assessment_prompt, overall_score
+
+load_dotenv()
 
 # Configuration
-BACKEND_URL = "http://localhost:8000"  # FastAPI backend URL
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000").rstrip("/")  # FastAPI backend URL
+
+# (connect, read) timeouts in seconds per endpoint. Connects fail fast; reads
+# allow for the work behind each endpoint (for streams, the gap between chunks)
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUTS = {
+    "/": 5,
+    "/jobs": 40,          # long-polls for up to 30s
+    "/gap": 75,           # the backend waits up to 60s before answering 202
+    "/parse": 150,
+    "/ask": 90,           # FAQ hits return at once; misses wait on the LLM
+    "/ask/stream": 30,
+    "/evaluate": 90,
+    "/evaluate/batch": 180,
+    "/questions": 60,     # bank hits are instant; top-ups wait on the LLM
+}
 BASE_DIR = Path(__file__).resolve().parent
-SKILLS_PATH = BASE_DIR / "data" / "skills.json"
 
-# Load skills for gap analysis
-skills_json = load_skills(SKILLS_PATH)
-all_skills = [skill.lower() for category in skills_json.values() for skill in category]
+# How long the UI waits for the backend to finish parsing a large resume
+PARSE_WAIT_SECONDS = 120
+# ... and for a gap analysis still running after /gap's own wait
+GAP_WAIT_SECONDS = 60
+# Answer evaluations in flight across all sessions of this Streamlit process.
+# The threads only wait on the backend, so this follows the number of
+# concurrent users, not the core count (the HTTP pool keeps 32 connections)
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", "32"))
+# Question prefetches in flight, sized the same way: one per session still
+# configuring an interview, each just waiting on /questions
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "32"))
+# Upper end of the question count slider. Prefetches always ask for this
+# many, so moving the slider slices the same result instead of refetching
+MAX_QUESTIONS = 10
+# Finished prefetches kept per session for settings the user may switch back to
+PREFETCH_CACHE_SIZE = 8
 
 # Page configuration
 st.set_page_config(
@@ -188,14 +215,28 @@ if 'sessions' not in st.session_state:
 if 'performance_data' not in st.session_state:
     # Track performance metrics: {date, score, interview_type, questions_answered, completion_rate}
     st.session_state.performance_data = []
+if 'performance_stats' not in st.session_state:
+    # Running totals over performance_data; 'version' bumps on every append
+    st.session_state.performance_stats = {
+        'version': len(st.session_state.performance_data),
+        'count': len(st.session_state.performance_data),
+        'score_sum': sum(p['score'] for p in st.session_state.performance_data),
+        'completion_sum': sum(p['completion_rate'] for p in st.session_state.performance_data),
+    }
 if 'performance_data_added' not in st.session_state:
     st.session_state.performance_data_added = False
-if 'ai_score_calculated' not in st.session_state:
-    st.session_state.ai_score_calculated = False
-if 'calculated_score' not in st.session_state:
-    st.session_state.calculated_score = 0
+if 'reports' not in st.session_state:
+    # Feedback reports keyed by report_key(user_answers): {score, assessment}
+    st.session_state.reports = {}
 if 'ai_questions_generated' not in st.session_state:
+    # True once the interview runs on the tailored set rather than fallbacks
     st.session_state.ai_questions_generated = False
+if 'pending_evaluations' not in st.session_state:
+    # Answer evaluations still running in the background: {answer index: future}
+    st.session_state.pending_evaluations = {}
+if 'question_prefetches' not in st.session_state:
+    # Background /questions requests by configuration: {key: future}, started once resume and JD are in
+    st.session_state.question_prefetches = {}
 
 # Helpers for history management
 def _make_session_title(mode: str, ts: float) -> str:
@@ -204,6 +245,17 @@ def _make_session_title(mode: str, ts: float) -> str:
     except Exception:
         return f"{mode or 'Session'}"
 
+def report_key(answers):
+    """Hash of an interview's answers; each distinct interview gets one report"""
+    payload = json.dumps([
+        [a.get('question'), a.get('answer', ''), a.get('skipped', False)] for a in answers
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_report(answers):
+    """Memoized report for these answers, reused across reruns"""
+    return st.session_state.reports.setdefault(report_key(answers), {})
+
 def archive_current_session():
     has_any_answer = bool(st.session_state.get('user_answers'))
     has_started = bool(st.session_state.get('interview_started'))
@@ -217,6 +269,7 @@ def archive_current_session():
         'questions': st.session_state.get('questions', []),
         'user_answers': st.session_state.get('user_answers', []),
         'current_question': st.session_state.get('current_question', 0),
+        'report': st.session_state.reports.get(report_key(st.session_state.get('user_answers', []))),
     }
     # Avoid duplicating identical consecutive sessions
     if not st.session_state.sessions or st.session_state.sessions[-1].get('user_answers') != session_obj['user_answers']:
@@ -230,12 +283,21 @@ def load_session(session_idx: int):
     st.session_state.interview_mode = sess.get('interview_mode')
     st.session_state.questions = sess.get('questions', [])
     st.session_state.user_answers = sess.get('user_answers', [])
+    if sess.get('report'):
+        st.session_state.reports[report_key(st.session_state.user_answers)] = sess['report']
     # Continue from next unanswered question
     st.session_state.current_question = min(len(st.session_state.user_answers), len(st.session_state.questions))
     st.session_state.interview_started = True
+    # An archived interview keeps its own questions
+    st.session_state.ai_questions_generated = True
+    st.session_state.pending_evaluations = {}
     st.rerun()
 
 def reset_for_new_chat():
+    # Finished evaluations go into the archive; ones still running are
+    # dropped and the report fills them in if the session is reopened
+    collect_evaluations()
+    st.session_state.pending_evaluations = {}
     archive_current_session()
     st.session_state.interview_started = False
     st.session_state.current_question = 0
@@ -243,7 +305,6 @@ def reset_for_new_chat():
     st.session_state.interview_mode = None
     st.session_state.questions = []
     st.session_state.performance_data_added = False
-    st.session_state.ai_score_calculated = False
     st.rerun()
 
 def calculate_interview_score(answers):
@@ -265,7 +326,12 @@ def calculate_interview_score(answers):
     return min(int(base_score + quality_bonus), 100)
 
 def calculate_ai_interview_score(answers):
-    """Calculate score using AI evaluation of all answers"""
+    """Calculate score from the answers' AI rubrics
+
+    When every answer already has its rubric the score is their weighted
+    mean, computed locally. Otherwise one /evaluate/batch call evaluates the
+    missing answers and returns the same aggregate.
+    """
     if not answers:
         return 0
     
@@ -274,46 +340,46 @@ def calculate_ai_interview_score(answers):
     if not answered_questions:
         return 0
     
-    # Create a comprehensive evaluation prompt
-    all_qa_pairs = "\n\n".join([
-        f"Question: {answer['question']}\nAnswer: {answer['answer']}\nAI Feedback: {answer.get('ai_feedback', 'No feedback available')}"
-        for answer in answered_questions
-    ])
-    
-    scoring_prompt = f"""
-    Based on the following interview questions, answers, and AI feedback, calculate an overall interview score out of 100.
+    if all(answer.get('ai_rubric') for answer in answered_questions):
+        return overall_score([answer['ai_rubric'] for answer in answered_questions])
     
-    {all_qa_pairs}
-    
-    Consider:
-    1. Technical accuracy and depth of knowledge
-    2. Communication clarity and structure
-    3. Use of examples and specific details
-    4. Problem-solving approach
-    5. Overall interview performance
-    
-    Provide ONLY a number between 0-100 as the final score. No explanation needed.
-    """
+    items = [
+        {
+            "question": answer['question'],
+            "answer": answer['answer'],
+            "feedback": answer.get('ai_feedback'),
+            "rubric": answer.get('ai_rubric'),
+        }
+        for answer in answered_questions
+    ]
     
     try:
-        response = call_backend_api("/ask", {"question": scoring_prompt})
+        response = call_backend_api("/evaluate/batch", {"items": items, "include_assessment": False})
         if response:
-            score_text = response.get("answer", "0").strip()
-            # Extract number from response
-            import re
-            score_match = re.search(r'\b(\d{1,3})\b', score_text)
-            if score_match:
-                score = int(score_match.group(1))
-                return min(max(score, 0), 100)  # Ensure score is between 0-100
+            for answer, result in zip(answered_questions, response.get("results", [])):
+                if result.get("rubric"):
+                    answer['ai_rubric'] = result["rubric"]
+                if result.get("feedback"):
+                    answer['ai_feedback'] = result["feedback"]
+            if response.get("score") is not None:
+                return response["score"]
     except Exception as e:
         st.warning(f"AI scoring failed: {e}")
     
     # Fallback to mock calculation if AI fails
     return calculate_interview_score(answers)
 
-def add_performance_data(interview_mode, answers, questions):
+def update_performance_stats(stats, entry):
+    """Fold one performance entry into the running totals"""
+    stats['count'] += 1
+    stats['score_sum'] += entry['score']
+    stats['completion_sum'] += entry['completion_rate']
+    stats['version'] += 1
+
+def add_performance_data(interview_mode, answers, questions, score=None):
     """Add performance data to tracking"""
-    score = calculate_ai_interview_score(answers)
+    if score is None:
+        score = calculate_ai_interview_score(answers)
     completion_rate = len([a for a in answers if a.get('answer', '').strip() and not a.get('skipped', False)]) / len(questions) if questions else 0
     
     performance_entry = {
@@ -326,13 +392,27 @@ def add_performance_data(interview_mode, answers, questions):
     }
     
     st.session_state.performance_data.append(performance_entry)
+    update_performance_stats(st.session_state.performance_stats, performance_entry)
 
 def create_performance_charts():
-    """Create performance tracking charts"""
+    """Performance tracking charts, rebuilt only when performance data changed"""
     if not st.session_state.performance_data:
         return None, None, None
     
-    df = pd.DataFrame(st.session_state.performance_data)
+    version = st.session_state.performance_stats['version']
+    cached = st.session_state.get('performance_charts')
+    if cached and cached[0] == version:
+        return cached[1]
+    charts = build_performance_charts(st.session_state.performance_data)
+    st.session_state.performance_charts = (version, charts)
+    return charts
+
+def build_performance_charts(performance_data):
+    # Imported here so cold starts and pages without charts skip pandas/plotly
+    import pandas as pd
+    import plotly.express as px
+    
+    df = pd.DataFrame(performance_data)
     df['date'] = pd.to_datetime(df['date'])
     
     # Score trend chart
@@ -357,13 +437,51 @@ def create_performance_charts():
     return score_chart, completion_chart, type_chart
 
 # AI Integration Functions
+@st.cache_resource
+def get_http_session():
+    """Process-wide pooled session shared by every Streamlit session
+
+    Keep-alive connections are reused across calls. Idempotent GETs are
+    retried with jittered backoff; POSTs are only retried when the
+    connection could not be made, since the request never reached the backend.
+    """
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=2,
+        status=2,
+        backoff_factor=0.3,
+        backoff_jitter=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def backend_timeout(endpoint):
+    """(connect, read) timeout for an endpoint, matched on its path prefix"""
+    path = endpoint.split("?", 1)[0]
+    if path in READ_TIMEOUTS:
+        return CONNECT_TIMEOUT, READ_TIMEOUTS[path]
+    prefix = "/" + path.strip("/").split("/", 1)[0]
+    return CONNECT_TIMEOUT, READ_TIMEOUTS.get(prefix, 30)
+
+def backend_request(method, endpoint, **kwargs):
+    """Raw backend request; connection errors and timeouts propagate to the caller"""
+    kwargs.setdefault("timeout", backend_timeout(endpoint))
+    return get_http_session().request(method, f"{BACKEND_URL}{endpoint}", **kwargs)
+
 def call_backend_api(endpoint, data=None):
     """Call the FastAPI backend"""
     try:
         if data:
-            response = requests.post(f"{BACKEND_URL}{endpoint}", json=data)
+            response = backend_request("POST", endpoint, json=data)
         else:
-            response = requests.get(f"{BACKEND_URL}{endpoint}")
+            response = backend_request("GET", endpoint)
         
         if response.status_code == 200:
             return response.json()
@@ -373,88 +491,233 @@ def call_backend_api(endpoint, data=None):
     except requests.exceptions.ConnectionError:
         st.warning("Backend not running. Please start the FastAPI server.")
         return None
+    except requests.exceptions.Timeout:
+        st.warning("Backend took too long to respond. Please try again.")
+        return None
 
-def generate_ai_questions(resume_text, job_description, interview_type, question_count):
-    """Generate AI-powered interview questions"""
-    prompt = f"""
-    Based on the following resume and job description, generate {question_count} {interview_type.lower()} interview questions.
-    
-    Resume: {resume_text[:1000]}...
-    
-    Job Description: {job_description[:1000]}...
-    
-    Please provide {question_count} specific, relevant questions that would be asked in a {interview_type} interview for this role.
-    Format each question on a new line starting with a number.
+def stream_backend_api(endpoint, data):
+    """Yield answer text from a server-sent-events backend endpoint as it arrives"""
+    try:
+        with backend_request("POST", endpoint, json=data, stream=True) as response:
+            if response.status_code != 200:
+                st.error(f"Backend error: {response.status_code}")
+                return
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    payload = json.loads(line[len("data: "):])
+                    if event == "error":
+                        st.error(f"Backend error: {payload.get('error')}")
+                    elif "delta" in payload:
+                        yield payload["delta"]
+                    event = None
+    except requests.exceptions.ConnectionError:
+        st.warning("Backend not running. Please start the FastAPI server.")
+    except requests.exceptions.Timeout:
+        st.warning("Backend stopped streaming. Please try again.")
+
+@st.cache_resource
+def get_question_bank():
+    """Local copy of the question bank for when the backend is unreachable"""
+    from backend.question_bank import load_question_bank
+    return load_question_bank()
+
+def get_fallback_questions(interview_type, question_count, difficulty="Medium", skills=()):
+    """Fallback questions from the local question bank, without LLM top-ups"""
+    questions, _ = get_question_bank().select(interview_type, difficulty, list(skills), question_count)
+    return [q["question"] for q in questions]
+
+def interview_skills():
+    """JD skills from the gap analysis, missing ones first"""
+    gap = st.session_state.get('gap_result')
+    if not gap:
+        return []
+    return gap['missing'] + [s for s in gap['jd_skills'] if s not in gap['missing']]
+
+@st.cache_resource
+def get_background_executor():
+    """Threads for question prefetches, which should not block a rerun"""
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="career-bg")
+
+@st.cache_resource
+def get_evaluation_executor():
+    """Threads for answer evaluations, kept apart so prefetches never hold up a Submit"""
+    return ThreadPoolExecutor(max_workers=EVALUATION_WORKERS, thread_name_prefix="career-eval")
+
+def question_request(interview_type, difficulty, job_description):
+    """Payload for /questions from the current configuration, for the largest interview"""
+    return {
+        "interview_type": interview_type,
+        "difficulty": difficulty,
+        "count": MAX_QUESTIONS,
+        "skills": interview_skills(),
+        # Varies between interviews, stable across reruns of this one
+        "seed": len(st.session_state.sessions),
+        "resume_text": st.session_state.get('resume_text', ""),
+        "job_description": job_description,
+    }
+
+def fetch_questions(http, payload):
+    """POST /questions; runs in a worker thread, so no st.* calls in here"""
+    response = http.post(f"{BACKEND_URL}/questions", json=payload, timeout=backend_timeout("/questions"))
+    response.raise_for_status()
+    return [q["question"] for q in response.json()["questions"]]
+
+def prefetch_questions(payload):
+    """Start generating questions for this configuration in the background; returns its key
+
+    Nothing is submitted while a request for the same configuration is
+    pending or has succeeded, so reruns and switching back to earlier
+    settings reuse it.
     """
-    
-    response = call_backend_api("/ask", {"question": prompt})
-    if response:
-        questions_text = response.get("answer", "")
-        # Parse questions from the response
-        questions = []
-        for line in questions_text.split('\n'):
-            line = line.strip()
-            if line and (line[0].isdigit() or line.startswith('Q:')):
-                # Remove numbering and clean up
-                question = line.split('.', 1)[-1].strip()
-                if question.startswith('Q:'):
-                    question = question[2:].strip()
-                if question:
-                    questions.append(question)
-        
-        return questions[:question_count] if questions else get_fallback_questions(interview_type, question_count)
-    
-    return get_fallback_questions(interview_type, question_count)
-
-def get_fallback_questions(interview_type, question_count):
-    """Fallback questions if AI generation fails"""
-    if interview_type == "Technical":
-        questions = [
-            "How would you optimize this algorithm for better time complexity?",
-            "Explain the concept of database indexing and why it's important.",
-            "Describe your approach to debugging a complex production issue.",
-            "How would you design a scalable notification system?",
-            "What's the difference between REST and GraphQL APIs?"
-        ]
-    elif interview_type == "Behavioral":
-        questions = [
-            "Tell me about a time you had to deal with a difficult teammate.",
-            "Describe a project where you had to meet a tight deadline.",
-            "How do you handle receiving critical feedback?",
-            "Tell me about a time you took initiative on a project.",
-            "Describe a situation where you had to persuade others to adopt your idea."
-        ]
-    else:  # Mixed
-        questions = [
-            "How would you approach optimizing a slow database query?",
-            "Tell me about a time you had to learn a new technology quickly.",
-            "Explain the concept of dependency injection.",
-            "Describe a situation where you had to make a trade-off between quality and speed.",
-            "How would you design a URL shortening service?"
-        ]
-    
-    return questions[:question_count]
-
-def evaluate_answer_with_ai(question, answer):
-    """Evaluate user's answer using AI"""
-    prompt = f"""
-    Evaluate this interview answer and provide constructive feedback:
-    
-    Question: {question}
-    Answer: {answer}
-    
-    Please provide:
-    1. A score out of 100
-    2. Strengths of the answer
-    3. Areas for improvement
-    4. Specific suggestions for a better answer
+    key = content_hash(json.dumps(payload, sort_keys=True))
+    prefetches = st.session_state.question_prefetches
+    future = prefetches.get(key)
+    if future and not future.cancelled() and (not future.done() or future.exception() is None):
+        return key
+    for other, pending in list(prefetches.items()):
+        # Configuration changed; requests that have not started yet are dropped
+        if pending.cancel():
+            del prefetches[other]
+    prefetches.pop(key, None)
+    prefetches[key] = get_background_executor().submit(fetch_questions, get_http_session(), payload)
+    for old in list(prefetches)[:-PREFETCH_CACHE_SIZE]:
+        if prefetches[old].done():
+            del prefetches[old]
+    return key
+
+def prefetched_questions(key):
+    """Prefetched questions for ``key`` if they are ready, else None"""
+    future = st.session_state.question_prefetches.get(key)
+    if not future or not future.done() or future.cancelled():
+        return None
+    try:
+        return future.result() or None
+    except Exception:
+        return None
+
+def select_questions(interview_type, difficulty, question_count, job_description):
+    """(questions, tailored) for a new interview, without waiting on the LLM
+
+    Uses the background result when it is ready. Otherwise the interview
+    starts on questions from the local bank, and apply_prefetched_questions
+    swaps in the tailored set once it arrives.
     """
+    payload = question_request(interview_type, difficulty, job_description)
+    key = prefetch_questions(payload)
+    # The prefetch stays pinned to this interview even if the settings change
+    st.session_state.interview_prefetch_key = key
+    questions = prefetched_questions(key)
+    if questions:
+        return questions[:question_count], True
+    return get_fallback_questions(interview_type, question_count, difficulty, payload["skills"]), False
+
+def apply_prefetched_questions():
+    """Swap not-yet-shown fallback questions for the tailored ones when ready"""
+    questions = prefetched_questions(st.session_state.get('interview_prefetch_key'))
+    if not questions:
+        return
+    current = st.session_state.questions
+    shown = current[:st.session_state.current_question + 1]
+    upcoming = [q for q in questions if q not in shown][:len(current) - len(shown)]
+    st.session_state.questions = shown + upcoming + current[len(shown) + len(upcoming):]
+    st.session_state.ai_questions_generated = True
+
+def request_evaluation(http, question, answer):
+    """{feedback, rubric} for one answer via /evaluate; runs in a worker thread, so no st.* calls in here"""
+    response = http.post(f"{BACKEND_URL}/evaluate", json={"question": question, "answer": answer},
+                         timeout=backend_timeout("/evaluate"))
+    response.raise_for_status()
+    return response.json()
+
+def evaluate_answer_with_ai(index, question, answer):
+    """Evaluate answer ``index`` in the background
+
+    The interview moves on at once; collect_evaluations copies the feedback
+    into user_answers when it is ready.
+    """
+    future = get_evaluation_executor().submit(request_evaluation, get_http_session(), question, answer)
+    st.session_state.pending_evaluations[index] = future
+
+def collect_evaluations(wait=False):
+    """Fill in finished evaluations; with wait=True, block until none are outstanding
+
+    A failed evaluation (or one without a valid rubric) leaves ai_rubric
+    empty, and /evaluate/batch fills it in when the report is scored.
+    """
+    pending = st.session_state.pending_evaluations
+    for index, future in list(pending.items()):
+        if not (wait or future.done()):
+            continue
+        try:
+            evaluation = future.result()
+        except Exception:
+            evaluation = {}
+        del pending[index]
+        if index < len(st.session_state.user_answers) and evaluation.get('feedback'):
+            st.session_state.user_answers[index]['ai_feedback'] = evaluation['feedback']
+            st.session_state.user_answers[index]['ai_rubric'] = evaluation.get('rubric')
+
+def content_hash(data):
+    """SHA-256 of uploaded bytes or text, used as a cache key"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+class JobFailed(Exception):
+    """A backend job finished with an error; raised so st.cache_data does not keep it"""
+
+def wait_for_job(job, submit, wait_seconds):
+    """Long-poll a backend job until it is done, raising if it fails or runs out of time"""
+    deadline = time.time() + wait_seconds
+    while job["status"] in ("pending", "running") and time.time() < deadline:
+        response = backend_request("GET", f"/jobs/{job['job_id']}", params={"wait": 10})
+        if response.status_code == 404:
+            # Jobs live in one backend worker's memory; ids are content hashes,
+            # so resubmitting is safe when the poll lands on another worker
+            job = submit()
+            continue
+        response.raise_for_status()
+        job = response.json()
+    if job["status"] in ("pending", "running"):
+        # Raising keeps the unfinished job out of the cache
+        raise TimeoutError("The backend is taking too long")
+    if job["status"] == "failed":
+        # Failures are often transient (timeouts, crashed workers), so they
+        # are not cached either
+        raise JobFailed(job.get("error") or "unknown error")
+    return job
+
+# Shared across sessions; max_entries bounds memory and evicts the oldest
+@st.cache_data(max_entries=32, ttl=3600, show_spinner=False)
+def parse_resume_cached(resume_hash, filename, _content):
+    """Parse a resume on the backend once per distinct file content
+
+    Returns the finished /parse job. Large files come back as a pending job
+    that is long-polled until it is done or PARSE_WAIT_SECONDS pass.
+    """
+    def submit():
+        response = backend_request("POST", "/parse", files={"file": (filename, _content)})
+        response.raise_for_status()
+        return response.json()
     
-    response = call_backend_api("/ask", {"question": prompt})
-    if response:
-        return response.get("answer", "Evaluation not available.")
-    
-    return "AI evaluation not available. Please ensure the backend is running."
+    return wait_for_job(submit(), submit, PARSE_WAIT_SECONDS)
+
+@st.cache_data(max_entries=128, ttl=3600, show_spinner=False)
+def analyze_gap_cached(resume_id, jd_hash, _resume_text, _job_description):
+    """Backend gap analysis once per (resume, job description) pair"""
+    def submit():
+        response = backend_request("POST", "/gap", json={
+            "resume_id": resume_id,
+            "resume_text": _resume_text,
+            "job_description": _job_description,
+        })
+        response.raise_for_status()
+        return response.json()
+    
+    return wait_for_job(submit(), submit, GAP_WAIT_SECONDS)["result"]
 
 def analyze_resume_gap(resume_file, job_description):
     """Analyze resume and job description for skill gaps"""
@@ -462,27 +725,22 @@ def analyze_resume_gap(resume_file, job_description):
         return None, None
     
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{resume_file.name.split('.')[-1]}") as tmp_file:
-            tmp_file.write(resume_file.getvalue())
-            tmp_file_path = tmp_file.name
+        content = resume_file.getvalue()
+        try:
+            job = parse_resume_cached(content_hash(content), resume_file.name, content)
+        except JobFailed as e:
+            st.error(f"Could not parse resume: {e}")
+            return None, None
         
-        # Parse resume
-        resume_text = parse_resume(tmp_file_path)
-        
-        # Clean up temp file
-        os.unlink(tmp_file_path)
-        
-        if resume_text:
-            # Analyze skill gap
-            gap_score, matched_skills = analyze_gap_fuzzy(resume_text, job_description, set(all_skills))
-            
-            # Find missing skills
-            jd_skills = {skill for skill in all_skills if skill in job_description.lower()}
-            missing_skills = jd_skills - matched_skills
-            
-            return gap_score, missing_skills
+        if job["result"]["text"]:
+            gap = analyze_gap_cached(job["result"]["resume_id"], content_hash(job_description),
+                                     job["result"]["text"], job_description)
+            st.session_state.gap_result = gap
+            st.session_state.resume_text = job["result"]["text"]
+            return gap["score"], set(gap["missing"])
         
+    except requests.exceptions.ConnectionError:
+        st.warning("Backend not running. Please start the FastAPI server.")
     except Exception as e:
         st.error(f"Error analyzing resume: {str(e)}")
     
@@ -510,8 +768,9 @@ with st.sidebar:
     
     # Performance summary
     if st.session_state.performance_data:
-        total_interviews = len(st.session_state.performance_data)
-        avg_score = sum(p['score'] for p in st.session_state.performance_data) / total_interviews
+        stats = st.session_state.performance_stats
+        total_interviews = stats['count']
+        avg_score = stats['score_sum'] / total_interviews
         latest_score = st.session_state.performance_data[-1]['score']
         
         col1, col2 = st.columns(2)
@@ -520,7 +779,7 @@ with st.sidebar:
             st.metric("Latest Score", f"{latest_score}/100")
         with col2:
             st.metric("Average Score", f"{avg_score:.1f}/100")
-            completion_rate = sum(p['completion_rate'] for p in st.session_state.performance_data) / total_interviews
+            completion_rate = stats['completion_sum'] / total_interviews
             st.metric("Avg Completion", f"{completion_rate:.1%}")
         
         # Performance charts
@@ -577,26 +836,32 @@ if st.session_state.resume_uploaded and st.session_state.jd_provided:
             )
         
         with col2:
-            question_count = st.slider("Number of questions", 3, 10, 5)
+            question_count = st.slider("Number of questions", 3, MAX_QUESTIONS, 5)
             difficulty = st.select_slider("Difficulty level", options=["Easy", "Medium", "Hard"])
+    
+    if not st.session_state.interview_started:
+        # Generate while the user is still choosing; Start then has nothing to wait for
+        prefetch_questions(question_request(interview_type, difficulty, job_description))
         
     # Start interview button
     if st.button("Start AI-Powered Interview", use_container_width=True):
-        # Start with fallback questions immediately for faster loading
-        questions = get_fallback_questions(interview_type, question_count)
+        questions, tailored = select_questions(interview_type, difficulty, question_count, job_description)
         
         st.session_state.interview_started = True
         st.session_state.interview_mode = interview_type
         st.session_state.questions = questions
         st.session_state.current_question = 0
         st.session_state.user_answers = []
+        st.session_state.pending_evaluations = {}
         st.session_state.performance_data_added = False
-        st.session_state.ai_score_calculated = False
-        st.session_state.ai_questions_generated = False
+        st.session_state.ai_questions_generated = tailored
         st.rerun()
 
 # Section 3: Interview Simulation
 if st.session_state.interview_started:
+    if not st.session_state.ai_questions_generated:
+        apply_prefetched_questions()
+    collect_evaluations()
     with st.container(border=True):
         st.markdown(f'<h2 class="section-header"> {st.session_state.interview_mode} Interview</h2>', unsafe_allow_html=True)
         
@@ -629,15 +894,15 @@ if st.session_state.interview_started:
             
             with col3:
                 if user_answer and st.button("Submit Answer", use_container_width=True):
-                    # Get AI evaluation
-                    with st.spinner("Evaluating your answer..."):
-                        ai_feedback = evaluate_answer_with_ai(current_q, user_answer)
+                    # Evaluated in the background; the next question shows right away
+                    evaluate_answer_with_ai(len(st.session_state.user_answers), current_q, user_answer)
                     
                     st.session_state.user_answers.append({
                         "question": current_q, 
                         "answer": user_answer, 
                         "skipped": False,
-                        "ai_feedback": ai_feedback
+                        "ai_feedback": None,
+                        "ai_rubric": None
                     })
                     st.session_state.current_question += 1
                     st.rerun()
@@ -650,59 +915,55 @@ if st.session_state.interview_started:
         # Feedback report
         st.markdown('<h2 class="section-header">Your Feedback Report</h2>', unsafe_allow_html=True)
         
-        # Calculate AI-powered overall score (only once)
-        if not st.session_state.get('ai_score_calculated', False):
-            with st.spinner("Calculating your interview score..."):
-                overall_score = calculate_ai_interview_score(st.session_state.user_answers)
-                st.session_state.ai_score_calculated = True
-                st.session_state.calculated_score = overall_score
-        else:
-            overall_score = st.session_state.get('calculated_score', 0)
-        
-        # Display the score
-        st.markdown(f'<div class="card"><h3>Overall Score: {overall_score}/100</h3></div>', unsafe_allow_html=True)
-        
-        # Add performance data to tracking (only once per interview)
-        if not st.session_state.get('performance_data_added', False):
-            add_performance_data(st.session_state.interview_mode, st.session_state.user_answers, st.session_state.questions)
-            st.session_state.performance_data_added = True
+        # Score and assessment are computed once the interview is over, and
+        # only once per distinct set of answers
+        interview_complete = st.session_state.current_question >= len(st.session_state.questions)
+        if interview_complete and st.session_state.pending_evaluations:
+            with st.spinner("Waiting for the last answer evaluations..."):
+                collect_evaluations(wait=True)
+        if interview_complete:
+            report = get_report(st.session_state.user_answers)
+            if 'score' not in report:
+                with st.spinner("Calculating your interview score..."):
+                    report['score'] = calculate_ai_interview_score(st.session_state.user_answers)
+            interview_score = report['score']
+            
+            # Display the score
+            st.markdown(f'<div class="card"><h3>Overall Score: {interview_score}/100</h3></div>', unsafe_allow_html=True)
+            
+            # Add performance data to tracking (only once per interview)
+            if not st.session_state.get('performance_data_added', False):
+                add_performance_data(st.session_state.interview_mode, st.session_state.user_answers,
+                                     st.session_state.questions, score=interview_score)
+                st.session_state.performance_data_added = True
         
         # AI-Generated Feedback
         st.markdown("#### AI-Generated Feedback")
         for i, answer_data in enumerate(st.session_state.user_answers):
-            if not answer_data.get('skipped', False) and answer_data.get('ai_feedback'):
+            evaluating = i in st.session_state.pending_evaluations
+            if not answer_data.get('skipped', False) and (answer_data.get('ai_feedback') or evaluating):
                 st.markdown(f"**Question {i+1}:** {answer_data['question']}")
                 st.markdown(f"**Your Answer:** {answer_data['answer']}")
-                st.markdown(f"**AI Feedback:** {answer_data['ai_feedback']}")
+                st.markdown(f"**AI Feedback:** {answer_data['ai_feedback'] or '_Evaluating..._'}")
                 st.markdown("---")
         
         # Generate AI-powered overall assessment
-        if st.session_state.user_answers:
-            with st.spinner("Generating overall assessment..."):
-                all_answers = "\n\n".join([
-                    f"Q: {answer['question']}\nA: {answer['answer']}" 
-                    for answer in st.session_state.user_answers 
-                    if not answer.get('skipped', False) and answer.get('answer', '').strip()
-                ])
-                
-                if all_answers:
-                    assessment_prompt = f"""
-                    Based on the following interview responses, provide a comprehensive assessment:
-                    
-                    {all_answers}
-                    
-                    Please provide:
-                    1. Overall strengths demonstrated
-                    2. Key areas for improvement
-                    3. Specific recommendations for better interview performance
-                    4. Relevant learning resources
-                    
-                    Format as a structured assessment with clear sections.
-                    """
-                    
-                    overall_assessment = evaluate_answer_with_ai("Overall Assessment", assessment_prompt)
-                    st.markdown("#### Overall Assessment")
-                    st.markdown(overall_assessment)
+        if interview_complete and st.session_state.user_answers:
+            answered = [
+                answer for answer in st.session_state.user_answers 
+                if not answer.get('skipped', False) and answer.get('answer', '').strip()
+            ]
+            
+            if answered:
+                st.markdown("#### Overall Assessment")
+                if 'assessment' in report:
+                    st.markdown(report['assessment'])
+                else:
+                    overall_assessment = st.write_stream(
+                        stream_backend_api("/ask/stream", {"question": assessment_prompt(answered)})
+                    )
+                    if isinstance(overall_assessment, str) and overall_assessment:
+                        report['assessment'] = overall_assessment
         
         # Download report button
         st.download_button(
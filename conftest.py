@@ -0,0 +1,7 @@
+import os
+
+# Keep the test run off the on-disk LLM cache and FAISS index in data/:
+# backend.app opens both at import time, so this must run before test
+# modules import it.
+os.environ["LLM_CACHE_PATH"] = ""
+os.environ["FAQ_INDEX_PATH"] = ""
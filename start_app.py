@@ -1,61 +1,71 @@
 #!/usr/bin/env python3
 """
 Startup script for the Interview Prep Bot application
+
+Starts the backend, waits until its /health endpoint answers, then starts
+the Streamlit frontend. Both processes are supervised: crashed ones are
+restarted and Ctrl+C / SIGTERM shuts both down gracefully.
+Pass --prod (or set APP_ENV=production) for multiple backend workers
+without reload.
 """
-import subprocess
+import argparse
 import sys
-import os
-import time
-import threading
 from pathlib import Path
 
-def start_backend():
-    """Start the FastAPI backend server in a separate thread"""
-    backend_dir = Path(__file__).parent / "backend"
-    os.chdir(backend_dir)
-    
-    try:
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "app:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000", 
-            "--reload"
-        ], check=True)
-    except Exception as e:
-        print(f"Backend error: {e}")
-
-def start_frontend():
-    """Start the Streamlit frontend"""
-    print("🎯 Starting Interview Prep Bot Frontend...")
-    time.sleep(3)  # Wait for backend to start
-    
-    try:
-        subprocess.run([
-            sys.executable, "-m", "streamlit", 
-            "run", "career.py",
-            "--server.port", "8501",
-            "--server.address", "0.0.0.0"
-        ], check=True)
-    except Exception as e:
-        print(f"Frontend error: {e}")
+from start_backend import (
+    BACKEND_DIR, HEALTH_URL, Supervisor,
+    backend_command, default_workers, is_production, wait_until_ready,
+)
+
+FRONTEND_PORT = 8501
+
+
+def frontend_command(production=False):
+    """Streamlit command line for the frontend"""
+    command = [
+        sys.executable, "-m", "streamlit",
+        "run", "career.py",
+        "--server.port", str(FRONTEND_PORT),
+        "--server.address", "0.0.0.0",
+    ]
+    if production:
+        command += ["--server.headless", "true", "--server.runOnSave", "false"]
+    return command
+
 
 def main():
     """Start both backend and frontend"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prod", action="store_true", help="run with multiple workers and no reload")
+    parser.add_argument("--workers", type=int, help="backend worker processes in production mode (default: cores)")
+    parser.add_argument("--ready-timeout", type=float, default=60.0, help="seconds to wait for the backend health check")
+    args = parser.parse_args()
+    production = is_production(args)
+
     print("🚀 Starting Interview Prep Bot...")
     print("📋 Make sure you have:")
     print("   1. Created a .env file with your GROQ_API_KEY")
     print("   2. Installed requirements: pip install -r requirements.txt")
     print("   3. Backend will run on: http://localhost:8000")
-    print("   4. Frontend will run on: http://localhost:8501")
+    print(f"   4. Frontend will run on: http://localhost:{FRONTEND_PORT}")
+    if production:
+        print(f"   5. Production mode: {args.workers or default_workers()} backend workers")
     print()
-    
-    # Start backend in a separate thread
-    backend_thread = threading.Thread(target=start_backend, daemon=True)
-    backend_thread.start()
-    
-    # Start frontend in main thread
-    start_frontend()
+
+    supervisor = Supervisor()
+    supervisor.add("backend", backend_command(production, args.workers), cwd=BACKEND_DIR)
+    supervisor.add("frontend", frontend_command(production), cwd=Path(__file__).parent)
+
+    supervisor.start("backend")
+    if not wait_until_ready(HEALTH_URL, timeout=args.ready_timeout):
+        print(f"❌ Backend did not become ready within {args.ready_timeout:.0f}s; check the logs above.")
+        supervisor.stop()
+        sys.exit(1)
+
+    print("🎯 Backend ready. Starting Interview Prep Bot Frontend...")
+    supervisor.start("frontend")
+    sys.exit(supervisor.run())
+
 
 if __name__ == "__main__":
     main()
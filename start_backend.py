@@ -1,36 +1,176 @@
 #!/usr/bin/env python3
 """
 Startup script for the Interview Prep Bot backend
+
+Development (default): one uvicorn process with --reload.
+Production (--prod or APP_ENV=production): several workers, no reload,
+graceful shutdown, and the server is restarted if it crashes.
 """
+import argparse
+import os
+import signal
 import subprocess
 import sys
-import os
+import time
+import urllib.request
 from pathlib import Path
 
+BACKEND_DIR = Path(__file__).parent / "backend"
+BACKEND_PORT = int(os.getenv("BACKEND_PORT", "8000"))
+HEALTH_URL = f"http://127.0.0.1:{BACKEND_PORT}/health"
+
+
+def default_workers():
+    """WEB_CONCURRENCY if set, otherwise one worker per core"""
+    return int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+
+
+def is_production(args=None):
+    return bool(args and args.prod) or os.getenv("APP_ENV", "").lower() == "production"
+
+
+def backend_command(production=False, workers=None):
+    """uvicorn command line for the backend, run from the backend directory"""
+    command = [
+        sys.executable, "-m", "uvicorn",
+        "app:app",
+        "--host", "0.0.0.0",
+        "--port", str(BACKEND_PORT),
+    ]
+    if production:
+        workers = workers or default_workers()
+        # uvicorn workers inherit this, so each sizes its resume parser pool
+        # to its share of the cores rather than to all of them
+        os.environ["WEB_CONCURRENCY"] = str(workers)
+        command += [
+            "--workers", str(workers),
+            "--timeout-graceful-shutdown", "20",
+        ]
+    else:
+        command.append("--reload")
+    return command
+
+
+def wait_until_ready(url=HEALTH_URL, timeout=60.0, interval=0.5):
+    """Poll a health endpoint until it answers 200 or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(interval)
+    return False
+
+
+class Supervisor:
+    """Runs child processes, restarts crashed ones, and stops them all on SIGINT/SIGTERM"""
+
+    def __init__(self, grace=25.0, max_restarts=5, window=60.0):
+        self.grace = grace
+        self.max_restarts = max_restarts
+        self.window = window
+        self.children = {}
+        self.stopping = False
+
+    def add(self, name, command, cwd=None):
+        self.children[name] = {"command": command, "cwd": cwd, "process": None, "restarts": []}
+
+    def start(self, name):
+        child = self.children[name]
+        child["process"] = subprocess.Popen(child["command"], cwd=child["cwd"])
+        return child["process"]
+
+    def _restart(self, name, code):
+        child = self.children[name]
+        now = time.monotonic()
+        child["restarts"] = [t for t in child["restarts"] if now - t < self.window]
+        if len(child["restarts"]) >= self.max_restarts:
+            print(f"❌ {name} keeps crashing (exit code {code}); giving up.")
+            return False
+        child["restarts"].append(now)
+        # Back off a little more on every restart inside the window
+        time.sleep(min(2 ** len(child["restarts"]), 30))
+        print(f"🔁 Restarting {name} (exit code {code})...")
+        self.start(name)
+        return True
+
+    def stop(self, *_):
+        if self.stopping:
+            return
+        self.stopping = True
+        running = [c["process"] for c in self.children.values() if c["process"] and c["process"].poll() is None]
+        for process in running:
+            process.terminate()
+        deadline = time.monotonic() + self.grace
+        for process in running:
+            try:
+                process.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def run(self):
+        """Block until every child exits cleanly, a child gives up, or we are signalled"""
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        exit_code = 0
+        while not self.stopping:
+            alive = False
+            for name, child in self.children.items():
+                process = child["process"]
+                if process is None:
+                    continue
+                code = process.poll()
+                if code is None:
+                    alive = True
+                elif code != 0 and not self.stopping:
+                    if self._restart(name, code):
+                        alive = True
+                    else:
+                        exit_code = code
+                        self.stop()
+                        break
+            if not alive:
+                break
+            time.sleep(1)
+        return exit_code
+
+
 def start_backend():
     """Start the FastAPI backend server"""
-    backend_dir = Path(__file__).parent / "backend"
-    
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prod", action="store_true", help="run with multiple workers and no reload")
+    parser.add_argument("--workers", type=int, help="worker processes in production mode (default: cores)")
+    args = parser.parse_args()
+    production = is_production(args)
+
     print("🚀 Starting Interview Prep Bot Backend...")
-    print("📍 Backend directory:", backend_dir)
-    
-    # Change to backend directory
-    os.chdir(backend_dir)
-    
-    # Start FastAPI server
-    try:
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "app:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000", 
-            "--reload"
-        ], check=True)
-    except KeyboardInterrupt:
-        print("\n🛑 Backend server stopped.")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error starting backend: {e}")
-        print("Make sure you have installed all requirements: pip install -r requirements.txt")
+    print("📍 Backend directory:", BACKEND_DIR)
+
+    command = backend_command(production, args.workers)
+    if not production:
+        # Reload mode: uvicorn's own reloader supervises the server
+        try:
+            subprocess.run(command, cwd=BACKEND_DIR, check=True)
+        except KeyboardInterrupt:
+            print("\n🛑 Backend server stopped.")
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error starting backend: {e}")
+            print("Make sure you have installed all requirements: pip install -r requirements.txt")
+        return
+
+    print(f"🏭 Production mode: {args.workers or default_workers()} workers")
+    supervisor = Supervisor()
+    supervisor.add("backend", command, cwd=BACKEND_DIR)
+    supervisor.start("backend")
+    if wait_until_ready():
+        print(f"✅ Backend ready at {HEALTH_URL}")
+    else:
+        print("⚠️ Backend did not report healthy yet; still supervising.")
+    sys.exit(supervisor.run())
+
 
 if __name__ == "__main__":
     start_backend()
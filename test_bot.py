@@ -1,6 +1,21 @@
 from fastapi.testclient import TestClient
-from unittest.mock import patch
-from backend.app import app
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import json
+import subprocess
+import sys
+import threading
+from unittest.mock import AsyncMock, patch
+import pytest
+from backend.app import MODEL, app, complete
+from backend.faq_semantic import load_semantic_index
+from backend.question_bank import QuestionBank
+from backend.llm_cache import LLMCache, cache_key
+from backend.parse_service import ResumeParser
+from backend.prompt_budget import count_tokens
+from backend.prompts import assessment_prompt, evaluation_prompt, parse_rubric, question_prompt
+from backend.utils import build_faq_index, find_answer, analyze_gap_fuzzy, extract_skills
 
 client=TestClient(app)
 
@@ -9,6 +24,11 @@ def test_root():
     assert response.status_code==200
     assert response.json()=={"message":"Interview Bot is running!"}
 
+def test_health():
+    response=client.get("/health")
+    assert response.status_code==200
+    assert response.json()["status"]=="ok"
+
 def test_faq_question():
     question = "What is Python?"
     response = client.post("/ask", json={"question": question})
@@ -17,7 +37,7 @@ def test_faq_question():
     assert "answer" in data
     assert data["answer"] == "Python is a high-level programming language known for simplicity."
  
-@patch("backend.app.client.chat.completions.create")
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
 def test_non_faq_question(mock_groq):
     mock_groq.return_value.choices = [type("Obj", (), {"message": type("Msg", (), {"content": "Mocked AI answer"})()})()]
 
@@ -28,4 +48,352 @@ def test_non_faq_question(mock_groq):
     assert "answer" in data
     assert data["answer"] == "Mocked AI answer"
 
+def test_faq_index_returns_best_match():
+    index = build_faq_index([
+        {"question": "What is FastAPI used for?", "answer": "first"},
+        {"question": "What is FastAPI?", "answer": "best"},
+    ])
+    faq, score = index.best_match("what is fastapi")
+    assert faq["answer"] == "best"
+    assert score == 100
+    assert find_answer("Tell me a joke", index) is None
+
+def test_semantic_faq_tier_catches_paraphrases(tmp_path):
+    pytest.importorskip("faiss")
+    faqs = [
+        {"question": "What is FastAPI?", "answer": "fastapi"},
+        {"question": "What is Python?", "answer": "python"},
+    ]
+    path = tmp_path / "faqs.faiss"
+    index = build_faq_index(faqs, semantic=load_semantic_index(faqs, path))
+    assert find_answer("Could you tell me about FastAPI", index) == "fastapi"
+    assert find_answer("What is Django?", index) is None
+    # A second worker memory-maps the persisted index instead of rebuilding it
+    reloaded = load_semantic_index(faqs, path)
+    assert path.exists() and reloaded.best_match("explain python")[0]["answer"] == "python"
+
+def test_semantic_faq_tier_rejects_different_questions():
+    pytest.importorskip("faiss")
+    faqs = [{"question": "What is Python?", "answer": "python"}]
+    semantic = load_semantic_index(faqs)
+    for question in ("Why Python?", "How does Python work?", "What is Python 3?", "What is Python used for?"):
+        assert semantic.best_match(question) is None, question
+    assert semantic.best_match("Can you explain what Python is")[0]["answer"] == "python"
+
+def test_question_bank_covers_skills_round_robin():
+    bank = QuestionBank([
+        {"question": "Python hard", "type": "Technical", "difficulty": "Hard", "skills": ["python"]},
+        {"question": "Python medium", "type": "Technical", "difficulty": "Medium", "skills": ["Python"]},
+        {"question": "AWS medium", "type": "Technical", "difficulty": "Medium", "skills": ["aws"]},
+        {"question": "Generic", "type": "Technical", "difficulty": "Medium", "skills": []},
+        {"question": "Teamwork", "type": "Behavioral", "difficulty": "Easy", "skills": []},
+    ])
+    questions, uncovered = bank.select("Technical", "Medium", ["aws", "python", "rust"], 3)
+    assert [q["question"] for q in questions] == ["AWS medium", "Python medium", "Python hard"]
+    assert uncovered == ["rust"]
+    questions, _ = bank.select("Mixed", "Medium", [], 2)
+    assert [q["type"] for q in questions] == ["Technical", "Behavioral"]
+
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
+def test_questions_endpoint_tops_up_uncovered_skills(mock_groq):
+    mock_groq.return_value.choices = [type("Obj", (), {"message": type("Msg", (), {"content": "1. Rust ownership?"})()})()]
+    mock_groq.return_value.usage = None
+    covered = client.post("/questions", json={"interview_type": "Technical", "count": 2, "skills": ["python"]})
+    assert all(q["source"] == "bank" for q in covered.json()["questions"])
+    assert mock_groq.call_count == 0
+
+    response = client.post("/questions", json={"interview_type": "Technical", "count": 3, "skills": ["python", "rust"]})
+    questions = response.json()["questions"]
+    assert response.json()["uncovered"] == ["rust"]
+    assert len(questions) == 3 and questions[-1] == {
+        "question": "Rust ownership?", "type": "Technical", "difficulty": "Medium", "skills": [], "source": "llm"}
+    assert mock_groq.call_count == 1
+
+def test_prompts_stay_within_token_budgets():
+    filler = "I organised the office party and managed the team lunch rota. " * 300
+    resume = filler + "Built Kubernetes operators in Go on AWS for the payments platform. " + filler
+    prompt = question_prompt(3, "Technical", resume_text=resume, job_description="Kubernetes, Go and AWS.", budget=400)
+    assert count_tokens(prompt) <= 400
+    assert "Kubernetes operators in Go" in prompt
+
+    assert count_tokens(evaluation_prompt("Q?", "word " * 5000, budget=300)) <= 300
+    items = [{"question": "Q1", "answer": "short"}, {"question": "Q2", "answer": "long answer " * 2000}]
+    prompt = assessment_prompt(items, budget=600)
+    assert count_tokens(prompt) <= 600
+    assert "A: short" in prompt and "A: long answer" in prompt
+
+def test_parse_rubric_validates_and_weights_scores():
+    reply = 'Here you go:\n```json\n{"scores": {"Clarity": 8, "Tech": 6, "Comm": 12}, "strengths": ["clear"], "tip": "add numbers"}\n```'
+    rubric = parse_rubric(reply)
+    assert rubric["scores"] == {"Clarity": 8, "Tech": 6, "Comm": 10}
+    assert rubric["score"] == 78  # 0.3*8 + 0.4*6 + 0.3*10
+    assert rubric["strengths"] == ["clear"] and rubric["improvements"] == []
+    assert parse_rubric('{"scores": {"Clarity": 8, "Tech": "good"}}') is None
+    assert parse_rubric("Score: 85/100") is None
+
+def test_gap_analysis_reports_positions():
+    resume = "Built APIs in Python, deployed on (AWS) with Dockerr"
+    jd = "We need python, aws, docker and kubernetes"
+    skills = {"python", "aws", "docker", "kubernetes"}
+    score, matched, positions = analyze_gap_fuzzy(resume, jd, skills, return_positions=True)
+    assert matched == {"python", "aws", "docker"}
+    assert score == 75
+    assert positions["python"] == (3, 4)
+    assert analyze_gap_fuzzy(resume, jd, skills) == (score, matched)
+
+def test_extract_skills_respects_token_boundaries():
+    skills = {"c", "c++", "r", "go", "machine learning", "learning", "node.js"}
+    jd = "Strong C++ and Go; machine\nlearning with Node.js. Great recruiting culture."
+    assert extract_skills(jd, skills) == {"c++", "go", "machine learning", "learning", "node.js"}
+
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
+def test_repeated_prompt_served_from_cache(mock_groq, tmp_path):
+    mock_groq.return_value.choices = [type("Obj", (), {"message": type("Msg", (), {"content": "Cached AI answer"})()})()]
+
+    with patch("backend.app.LLM_CACHE", LLMCache(path=tmp_path / "cache.sqlite3")):
+        first = client.post("/ask", json={"question": "Explain vector databases."}).json()
+        second = client.post("/ask", json={"question": "Explain vector databases."}).json()
+    assert first == {"answer": "Cached AI answer"}
+    assert second == {"answer": "Cached AI answer", "source": "cache"}
+    assert mock_groq.call_count == 1
+
+def test_concurrent_identical_prompts_share_one_call():
+    async def slow_completion(**kwargs):
+        await asyncio.sleep(0.05)
+        return type("Resp", (), {"choices": [type("Obj", (), {"message": type("Msg", (), {"content": "Shared"})()})()]})()
+
+    async def ask_many():
+        return await asyncio.gather(*[complete([{"role": "user", "content": "same prompt"}]) for _ in range(5)])
+
+    with patch("backend.app.client.chat.completions.create", side_effect=slow_completion) as mock_groq, \
+            patch("backend.app.LLM_CACHE", LLMCache()):
+        results = asyncio.run(ask_many())
+    assert results == [("Shared", None)] * 5
+    assert mock_groq.call_count == 1
+
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
+def test_stream_relays_tokens_as_events(mock_groq):
+    async def chunks():
+        for text in ["Gen", "AI ", "streams"]:
+            yield type("Chunk", (), {"choices": [type("Obj", (), {"delta": type("Delta", (), {"content": text})()})()]})()
+    mock_groq.return_value = chunks()
+
+    with patch("backend.app.LLM_CACHE", LLMCache()):
+        response = client.post("/ask/stream", json={"question": "Explain streaming."})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.count("data: ") == 4
+    assert '"delta": "AI "' in response.text
+    assert response.text.endswith('event: done\ndata: {"source": null}\n\n')
+
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
+def test_empty_stream_is_not_cached(mock_groq):
+    async def no_chunks():
+        yield type("Chunk", (), {"choices": []})()
+    mock_groq.return_value = no_chunks()
+
+    cache = LLMCache()
+    with patch("backend.app.LLM_CACHE", cache):
+        client.post("/ask/stream", json={"question": "Say nothing."})
+    assert cache.get(cache_key(MODEL, [{"role": "user", "content": "Say nothing."}])) is None
+
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
+def test_batch_evaluation_reuses_rubrics_and_scores_locally(mock_groq):
+    reply = '{"scores": {"Clarity": 7, "Tech": 7, "Comm": 7}, "strengths": ["structured"], "improvements": [], "tip": ""}'
+    mock_groq.return_value.choices = [type("Obj", (), {"message": type("Msg", (), {"content": reply})()})()]
+
+    reviewed = {"scores": {"Clarity": 9, "Tech": 9, "Comm": 9}}
+    items = [
+        {"question": "Q1", "answer": "A1"},
+        {"question": "Q2", "answer": "A2", "feedback": "Already reviewed", "rubric": reviewed},
+        {"question": "Q3", "answer": "", "skipped": True},
+    ]
+    with patch("backend.app.LLM_CACHE", LLMCache()):
+        response = client.post("/evaluate/batch", json={"items": items})
+    data = response.json()
+    assert data["results"][0]["rubric"]["score"] == 70
+    assert data["results"][0]["feedback"].startswith("**Score: 70/100**")
+    assert data["results"][1]["feedback"] == "Already reviewed"
+    assert data["results"][2] == {"question": "Q3", "feedback": None, "rubric": None}
+    assert data["score"] == 80
+    assert data["assessment"] == reply
+    # one evaluation and one assessment call; the score needs none
+    assert mock_groq.call_count == 2
+    assert mock_groq.call_args_list[0].kwargs["response_format"] == {"type": "json_object"}
+
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
+def test_batch_evaluation_counts_failed_calls(mock_groq):
+    mock_groq.side_effect = TimeoutError("upstream timed out")
+    with patch("backend.app.LLM_CACHE", LLMCache()):
+        data = client.post("/evaluate/batch", json={"items": [{"question": "Qe", "answer": "Ae"}]}).json()
+    assert data["score"] is None and data["assessment"] is None
+    text = client.get("/metrics").text
+    assert 'interview_bot_errors_total{stage="evaluation",type="TimeoutError"}' in text
+    assert 'interview_bot_errors_total{stage="assessment",type="TimeoutError"}' in text
+
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
+def test_evaluate_falls_back_to_text_without_rubric(mock_groq):
+    mock_groq.return_value.choices = [type("Obj", (), {"message": type("Msg", (), {"content": "Looks fine"})()})()]
+    with patch("backend.app.LLM_CACHE", LLMCache()):
+        response = client.post("/evaluate", json={"question": "Q", "answer": "A"})
+        assert response.json() == {"feedback": "Looks fine", "rubric": None}
+        # The rejected reply was not cached, so the batch fallback asks again
+        mock_groq.return_value.choices = [type("Obj", (), {"message": type("Msg", (), {"content":
+            '{"scores": {"Clarity": 6, "Tech": 6, "Comm": 6}}'})()})()]
+        data = client.post("/evaluate/batch", json={"items": [{"question": "Q", "answer": "A"}],
+                                                    "include_assessment": False}).json()
+    assert data["score"] == 60
+    assert mock_groq.call_count == 2
+
+def test_resume_parser_returns_structured_results(tmp_path):
+    parser = ResumeParser(max_workers=1, timeout=60)
+    try:
+        parsed = parser.parse("samples/resume.pdf")
+        assert parsed.ok and parsed.error is None
+        assert parsed.text.strip()
+
+        broken = parser.parse_bytes(b"not a pdf", ".pdf")
+        assert not broken.ok and broken.error == "parse_error"
+    finally:
+        parser.shutdown()
+    assert parser.parse(str(tmp_path / "resume.txt")).error == "unsupported"
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_resume_parser_timeout_only_kills_its_own_job(tmp_path):
+    # Opening a FIFO with no writer blocks, so this job hangs until killed
+    fifo = tmp_path / "stuck.pdf"
+    os.mkfifo(fifo)
+    parser = ResumeParser(max_workers=1, timeout=60)
+    try:
+        with ThreadPoolExecutor(3) as pool:
+            stuck = pool.submit(parser.parse, str(fifo), timeout=0.5)
+            queued = [pool.submit(parser.parse, "samples/resume.pdf") for _ in range(2)]
+            assert stuck.result().error == "timeout"
+            assert all(job.result().ok for job in queued)
+    finally:
+        parser.shutdown()
+
+def test_parse_then_gap_by_resume_id():
+    with open("samples/resume.pdf", "rb") as f:
+        parsed = client.post("/parse", files={"file": ("resume.pdf", f, "application/pdf")})
+    assert parsed.status_code == 200
+    job = parsed.json()
+    assert job["status"] == "done"
+    assert job["result"]["text"].strip()
+    assert client.get(f"/jobs/{job['job_id']}").json()["status"] == "done"
+
+    gap = client.post("/gap", json={"resume_id": job["result"]["resume_id"], "job_description": "Python and Kubernetes"})
+    assert gap.status_code == 200
+    result = gap.json()["result"]
+    assert set(result["jd_skills"]) == {"python", "kubernetes"}
+    assert set(result["matched"]) | set(result["missing"]) == {"python", "kubernetes"}
+
+    assert client.get("/jobs/unknown").status_code == 404
+
+def test_gap_jobs_are_keyed_on_the_analyzed_text():
+    first = client.post("/gap", json={"resume_id": "same", "resume_text": "Python developer",
+                                      "job_description": "Python and Kubernetes"}).json()
+    second = client.post("/gap", json={"resume_id": "same", "resume_text": "Kubernetes operator",
+                                       "job_description": "Python and Kubernetes"}).json()
+    assert first["result"]["matched"] == ["python"]
+    assert second["result"]["matched"] == ["kubernetes"]
+
+def test_parse_rejects_unsupported_types_without_leaking_paths():
+    response = client.post("/parse", files={"file": ("resume.txt", b"plain text", "text/plain")})
+    assert response.status_code == 415
+    broken = client.post("/parse", files={"file": ("broken.pdf", b"not a pdf", "application/pdf")}).json()
+    assert broken["status"] == "failed"
+    assert broken["error"] == "the document could not be read"
+
+# Cold-import budget for backend.utils, checked with python -X importtime
+UTILS_IMPORT_BUDGET_MS = float(os.getenv("UTILS_IMPORT_BUDGET_MS", "150"))
+
+def test_backend_utils_import_is_lazy_and_within_budget():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.utils"],
+        capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                timings[name.strip()] = int(cumulative)
+    assert not {"rapidfuzz", "PyPDF2", "docx", "numpy"} & set(timings)
+    assert timings["backend.utils"] / 1000 < UTILS_IMPORT_BUDGET_MS
+
+@patch("backend.app.client.chat.completions.create", new_callable=AsyncMock)
+def test_metrics_expose_ask_pipeline(mock_groq):
+    mock_groq.return_value.choices = [type("Obj", (), {"message": type("Msg", (), {"content": "Metered"})()})()]
+    mock_groq.return_value.usage = type("Usage", (), {"prompt_tokens": 12, "completion_tokens": 30})()
+
+    client.post("/ask", json={"question": "What is Python?"})
+    with patch("backend.app.LLM_CACHE", LLMCache()):
+        client.post("/ask", json={"question": "Explain observability."})
+    text = client.get("/metrics").text
+
+    assert 'interview_bot_faq_lookups_total{result="hit"}' in text
+    assert 'interview_bot_faq_lookups_total{result="miss"}' in text
+    assert 'interview_bot_llm_request_seconds_count{mode="blocking"}' in text
+    assert 'interview_bot_request_duration_seconds_bucket{route="/ask",le="+Inf"}' in text
+    assert "interview_bot_faq_match_seconds_sum" in text
+    assert 'interview_bot_llm_tokens_total{kind="completion"}' in text
+    assert 'interview_bot_llm_call_tokens_count{task="ask",kind="prompt"}' in text
+    assert "interview_bot_requests_in_flight 1" in text
+
+USRSTORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "UserData", "interview-Evaluation", "main")
+
+@pytest.fixture
+def usrstore(tmp_path, monkeypatch):
+    """The prototype's SQLite store with its data/ dir under tmp_path"""
+    monkeypatch.syspath_prepend(USRSTORE_DIR)
+    monkeypatch.chdir(tmp_path)
+    import usrstore
+    monkeypatch.setattr(usrstore, "_local", threading.local())
+    yield usrstore
+    usrstore.conn().close()
+
+def test_usrstore_imports_legacy_json_once(usrstore, tmp_path):
+    (tmp_path / "data").mkdir()
+    legacy = tmp_path / "data" / "user_OLD.json"
+    legacy.write_text(json.dumps({"history": [{
+        "questions": ["q1", "q2"], "answers": ["a1", "a2"], "idx": 2, "done": True, "date": "2025-01-01 10:00",
+        "feedback": [[{"Clarity": 6, "Tech": 8}, {}, ""], [{"Clarity": 8, "Tech": 10}, {}, ""]],
+    }]}))
+    assert usrstore.user_exists("OLD")
+    assert not legacy.exists() and (tmp_path / "data" / "user_OLD.json.imported").exists()
+    [header] = usrstore.listSess("OLD")
+    assert header["n_answers"] == 2 and header["avg"] == 8
+    assert header["avg_scores"] == {"Clarity": 7, "Tech": 9}
+    assert usrstore.loadSess("OLD", header["id"])["answers"] == ["a1", "a2"]
+    assert not usrstore.user_exists("NOBODY")
+
+def test_usrstore_saves_answers_and_pages_history(usrstore):
+    for n in range(3):
+        sess = {"questions": ["q1", "q2"], "idx": 1}
+        sess["id"] = usrstore.saveAns("U", sess, 0, "first draft", [{"Clarity": 4}, {}, ""])
+        # Re-submitting a position replaces its row instead of adding one
+        usrstore.saveAns("U", sess, 0, f"answer {n}", [{"Clarity": 6}, {}, ""])
+        if n < 2:
+            usrstore.saveAns("U", {**sess, "idx": 2}, 1, "second", [{"Clarity": 8}, {}, ""])
+            usrstore.markDone("U", sess)
+
+    open_sess = usrstore.loadOpen("U")
+    assert open_sess["id"] == sess["id"] and open_sess["answers"] == ["answer 2"]
+    assert usrstore.countSess("U") == 3
+    newest, middle = usrstore.listSess("U", offset=0, limit=2)
+    assert not newest["done"] and newest["avg"] is None
+    assert middle["done"] and middle["n_answers"] == 2 and middle["avg"] == 7
+    [oldest] = usrstore.listSess("U", offset=2, limit=2)
+    assert usrstore.loadSess("U", oldest["id"])["answers"] == ["answer 0", "second"]
+    assert usrstore.loadSess("SOMEONE_ELSE", oldest["id"]) is None
+
+def test_llm_cache_disk_tier_and_ttl(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = LLMCache(path=path)
+    cache.set("k", "v")
+    # Disk writes are queued to a writer thread; flush waits for the commit
+    cache.flush()
+    assert LLMCache(path=path).get("k") == "v"
+    assert LLMCache(path=path, ttl=-1).get("k") is None
+
 print("All tests passed successfully!")